@@ -0,0 +1,66 @@
+"""Per-query latency: a new connection per query (the old ensure_db() pattern) vs the shared Database.
+
+Usage: python -m benchmarks.db_latency [iterations]
+Runs against a throw-away database file, never data/bot.db.
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+from utils.db import Database, _open, migrate
+
+QUERY = "SELECT id, owner_id FROM voctemp_rooms WHERE guild_id=? AND voice_channel_id=? AND active=1"
+
+
+def _report(label: str, samples: List[float]) -> None:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<28} p50={statistics.median(samples) * 1000:7.3f} ms  p99={p99 * 1000:7.3f} ms  n={len(samples)}")
+
+
+async def _measure(fn: Callable[[int], Awaitable[None]], iterations: int) -> List[float]:
+    samples: List[float] = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        db = Database(path)
+        await db.connect()
+        async with db.acquire() as conn:
+            await conn.executemany(
+                "INSERT INTO voctemp_rooms(guild_id, hub_id, owner_id, voice_channel_id, active) VALUES(1, 1, ?, ?, ?)",
+                [(i, i, i % 2) for i in range(5000)],
+            )
+            await conn.commit()
+
+        async def legacy(i: int) -> None:
+            conn = await _open(path)
+            await migrate(conn)
+            async with conn.execute(QUERY, (1, i % 5000)) as cur:
+                await cur.fetchone()
+            await conn.close()
+
+        async def shared(i: int) -> None:
+            async with db.acquire() as conn:
+                async with conn.execute(QUERY, (1, i % 5000)) as cur:
+                    await cur.fetchone()
+
+        _report("connection per query", await _measure(legacy, iterations))
+        _report("Database.acquire()", await _measure(shared, iterations))
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
@@ -0,0 +1,166 @@
+"""In-process stand-ins for the Discord objects VoiceTemp touches, for offline benchmarks.
+
+FakeBot is a real commands.Bot that never connects: its connection state,
+view store and dynamic item registry are discord.py's own, and messages are
+sent through the library's Messageable.send. Only REST is stubbed: every
+call goes through StubHTTP, which counts calls per route and can add a
+fixed latency. Voice membership is kept consistent the way the gateway
+cache would be: FakeGuild.set_voice() updates the member and the channel
+member lists, and returns the (before, after) voice states so a harness can
+dispatch on_voice_state_update.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+
+_ids = itertools.count(10_000)
+
+
+class StubHTTP:
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+
+    async def call(self, route: str) -> None:
+        self.calls[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    # The two HTTPClient routes discord.py's Message / Messageable use here
+
+    async def send_message(self, channel_id: int, *, params) -> dict:
+        await self.call("send_message")
+        return {
+            "id": str(next(_ids)),
+            "channel_id": str(channel_id),
+            "author": {"id": "1", "username": "bot", "discriminator": "0", "avatar": None},
+            "content": "",
+            "timestamp": discord.utils.utcnow().isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        }
+
+    async def delete_message(self, channel_id: int, message_id: int, *, reason: Optional[str] = None) -> None:
+        await self.call("delete_message")
+
+
+class FakeVoiceState:
+    def __init__(self, channel: Optional["FakeVoice"]) -> None:
+        self.channel = channel
+
+
+class FakeVoice(discord.VoiceChannel):
+    def __init__(self, guild: "FakeGuild", name: str = "") -> None:
+        self.id = next(_ids)
+        self.name = name
+        self._guild = guild
+        self._state = guild.state
+        self._members: List["FakeMember"] = []
+
+    @property
+    def members(self):
+        return self._members
+
+    async def edit(self, **kwargs) -> None:
+        await self._guild.http.call("edit_channel")
+        if "name" in kwargs:
+            self.name = kwargs["name"]
+
+    async def delete(self, reason: Optional[str] = None) -> None:
+        await self._guild.http.call("delete_channel")
+        self._guild.channels.pop(self.id, None)
+
+
+class FakeText(discord.TextChannel):
+    def __init__(self, guild: "FakeGuild") -> None:
+        self.id = next(_ids)
+        self._guild = guild
+        self._state = guild.state
+
+    async def delete(self, reason: Optional[str] = None) -> None:
+        await self._guild.http.call("delete_channel")
+        self._guild.channels.pop(self.id, None)
+
+
+class FakeCategory(discord.CategoryChannel):
+    def __init__(self) -> None:
+        self.id = next(_ids)
+
+
+class FakeMember:
+    def __init__(self, guild: "FakeGuild") -> None:
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = self.display_name = f"membre{self.id}"
+        self.mention = f"<@{self.id}>"
+        self.voice: Optional[FakeVoiceState] = None
+
+    async def move_to(self, channel: Optional[FakeVoice], reason: Optional[str] = None) -> None:
+        await self.guild.http.call("move_member")
+        before, after = self.guild.set_voice(self, channel)
+        if self.guild.on_voice_state is not None:
+            # The gateway answers a move with its own voice_state_update
+            asyncio.create_task(self.guild.on_voice_state(self, before, after))
+
+
+class FakeGuild:
+    def __init__(self, bot: "FakeBot") -> None:
+        self.id = next(_ids)
+        self.http = bot.stub_http
+        self.state = bot._connection
+        self.default_role = object()
+        self.me = object()
+        self.unavailable = False
+        self.category = FakeCategory()
+        self.channels: Dict[int, object] = {self.category.id: self.category}
+        # Set by a harness to receive the voice_state_update caused by move_to()
+        self.on_voice_state: Optional[Callable[[FakeMember, FakeVoiceState, FakeVoiceState], Awaitable[None]]] = None
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    def set_voice(self, member: FakeMember, channel: Optional[FakeVoice]) -> Tuple[FakeVoiceState, FakeVoiceState]:
+        before = member.voice or FakeVoiceState(None)
+        if before.channel is not None and member in before.channel.members:
+            before.channel.members.remove(member)
+        if channel is not None:
+            channel.members.append(member)
+        member.voice = FakeVoiceState(channel) if channel is not None else None
+        return before, FakeVoiceState(channel)
+
+    async def create_voice_channel(self, name: str, **kwargs) -> FakeVoice:
+        await self.http.call("create_channel")
+        ch = FakeVoice(self, name)
+        self.channels[ch.id] = ch
+        return ch
+
+    async def create_text_channel(self, name: str, **kwargs) -> FakeText:
+        await self.http.call("create_channel")
+        ch = FakeText(self)
+        self.channels[ch.id] = ch
+        return ch
+
+
+class FakeBot(commands.Bot):
+    def __init__(self, db, http: Optional[StubHTTP] = None) -> None:
+        super().__init__(command_prefix="+", intents=discord.Intents.none())
+        self.db = db
+        self.stub_http = http or StubHTTP()
+        self._connection.http = self.stub_http  # type: ignore[assignment]
+        self.guild = FakeGuild(self)
+
+    def get_guild(self, guild_id: int) -> Optional[FakeGuild]:  # type: ignore[override]
+        return self.guild if guild_id == self.guild.id else None
@@ -0,0 +1,134 @@
+"""Synthetic voice-event load against VoiceTemp, offline.
+
+Usage: python -m benchmarks.voctemp_load [--members N] [--flaps N] [--states N]
+                                         [--latency MS] [--spares N] [--panel-in-voice]
+
+Every member joins the hub, waits to be moved into their room, leaves and
+rejoins it --flaps times, toggles mute --states times, then leaves for good.
+The cog sees the same voice_state_update stream the gateway would send,
+including the move events caused by its own move_to() calls. REST calls
+go through benchmarks.fakes.StubHTTP (--latency ms each), SQL runs against
+a throw-away database.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import cogs.voctemp as voctemp
+from benchmarks.fakes import FakeBot, FakeGuild, FakeMember, FakeVoice, FakeVoiceState, StubHTTP
+from cogs.voctemp import VoiceTemp, classify_voice_event, percentile
+from utils.db import Database
+
+
+class Recorder:
+    """Wraps on_voice_state_update: handling time per event class, SQL statements issued."""
+
+    def __init__(self, cog: VoiceTemp) -> None:
+        self.cog = cog
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statements = 0
+
+    def on_sql(self, statement: str) -> None:
+        self.statements += 1
+
+    async def dispatch(self, member, before, after) -> None:
+        kind = classify_voice_event(before, after)
+        start = time.perf_counter()
+        await self.cog.on_voice_state_update(member, before, after)
+        self.latencies[kind].append((time.perf_counter() - start) * 1000)
+
+
+async def _member_session(rec: Recorder, guild: FakeGuild, hub: FakeVoice, flaps: int, states: int) -> None:
+    member = FakeMember(guild)
+    await rec.dispatch(member, *guild.set_voice(member, hub))
+    # Wait for the cog to move us out of the hub
+    while member.voice is None or member.voice.channel is hub:
+        await asyncio.sleep(0.001)
+    room = member.voice.channel
+    for _ in range(flaps):
+        await rec.dispatch(member, *guild.set_voice(member, None))
+        await rec.dispatch(member, *guild.set_voice(member, room))
+    for _ in range(states):
+        # mute / unmute: same channel before and after
+        await rec.dispatch(member, FakeVoiceState(room), FakeVoiceState(room))
+    await rec.dispatch(member, *guild.set_voice(member, None))
+
+
+async def main(args: argparse.Namespace) -> int:
+    voctemp.EMPTY_ROOM_TIMEOUT = 0.05
+    http = StubHTTP(latency=args.latency / 1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(Path(tmp) / "bench.db")
+        await db.connect()
+        bot = FakeBot(db, http)
+        guild = bot.guild
+        hub = FakeVoice(guild, "hub")
+        guild.channels[hub.id] = hub
+        async with db.acquire() as conn:
+            await conn.execute(
+                "INSERT INTO voctemp_hubs(guild_id, category_id, target_category_id, hub_channel_id, name, perms_mask, spare_pool_size, panel_in_voice) VALUES(?,?,?,?,?,?,?,?)",
+                (guild.id, guild.category.id, guild.category.id, hub.id, "hub", 0, args.spares, int(args.panel_in_voice)),
+            )
+            await conn.commit()
+        cog = VoiceTemp(bot)
+        await cog.cog_load()
+        rec = Recorder(cog)
+        guild.on_voice_state = rec.dispatch
+        if args.spares:
+            await cog._reconcile_spares()
+            while sum(len(p.channels) for p in cog.spare_pools.values()) < args.spares:
+                await asyncio.sleep(0.01)
+        await db.writes.flush()
+        http.calls.clear()
+        await db._conn.set_trace_callback(rec.on_sql)  # type: ignore[union-attr]
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_member_session(rec, guild, hub, args.flaps, args.states) for _ in range(args.members)))
+        # Let the deletion scheduler and spare refills drain
+        while cog.rooms or len(cog.deletions) or any(t and not t.done() for t in cog._refill_tasks.values()):
+            await asyncio.sleep(0.01)
+        await db.writes.flush()
+        elapsed = time.perf_counter() - start
+
+        await db._conn.set_trace_callback(None)  # type: ignore[union-attr]
+        await cog.cog_unload()
+        await db.close()
+
+    events = sum(len(v) for v in rec.latencies.values())
+    rest = sum(http.calls.values())
+    print(f"{args.members} membres, {args.flaps} flap(s), {args.states} état(s), latence REST {args.latency:g} ms, réserve {args.spares}, panneau {'vocal' if args.panel_in_voice else 'salon'}")
+    print(f"événements: {events} en {elapsed:.2f} s -> {events / elapsed:,.0f} évts/s")
+    print(f"requêtes SQL: {rec.statements} -> {rec.statements / events:.2f} par événement")
+    print(f"appels REST: {rest} -> {rest / args.members:.1f} par salon ({', '.join(f'{k} {v}' for k, v in sorted(http.calls.items()))})")
+    all_lat: List[float] = [x for v in rec.latencies.values() for x in v]
+    print(f"traitement: p50 {percentile(all_lat, 0.5):.3f} ms | p99 {percentile(all_lat, 0.99):.3f} ms")
+    for kind in voctemp.VOICE_EVENT_KINDS:
+        lat = rec.latencies.get(kind)
+        if lat:
+            print(f"  {kind:<6} n={len(lat):<6} p50 {percentile(lat, 0.5):8.3f} ms | p99 {percentile(lat, 0.99):8.3f} ms")
+    suppressed = Counter({k: v for k, v in cog.suppressed_creations.items() if v})
+    if suppressed:
+        print(f"créations évitées: {dict(suppressed)}")
+    return 0
+
+
+def _parse(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.voctemp_load", description="Charge synthétique sur VoiceTemp (hors-ligne)")
+    parser.add_argument("--members", type=int, default=200, help="membres qui rejoignent le hub en même temps")
+    parser.add_argument("--flaps", type=int, default=3, help="sorties/retours rapides par membre dans son salon")
+    parser.add_argument("--states", type=int, default=5, help="événements mute/unmute par membre")
+    parser.add_argument("--latency", type=float, default=0.0, help="latence simulée par appel REST (ms)")
+    parser.add_argument("--spares", type=int, default=0, help="salons de réserve du hub")
+    parser.add_argument("--panel-in-voice", action="store_true", help="panneau dans le chat du salon vocal")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(_parse(sys.argv[1:]))))
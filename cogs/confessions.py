@@ -1,22 +1,37 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+import logging
+import sqlite3
+from typing import Dict, Optional, Set
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 import time
 
+from utils.cache import LRUCache
 from utils.config import config
-from utils.db import ensure_db, next_counter, get_counter
+from utils.db import Database
 from utils.embeds import success_embed, error_embed
+from utils.log_dispatch import LogDispatcher
+from utils.metrics import StageTimings
+from utils.outbox import Outbox
 from utils.permissions import app_is_staff
+from utils.ratelimit import RateLimiter
+
+logger = logging.getLogger("cigaming_bot.confessions")
 
 CONFESS_BTN_REPLY_ID = "confess:reply"
 CONFESS_BTN_REPORT_ID = "confess:report"
 CONFESS_BTN_DELETE_ID = "confess:delete"
 
+# Duration samples kept per /confesser stage for /confessionstats
+SUBMIT_TIMING_SAMPLES = 500
+# Stages of /confesser in pipeline order: "total" is what the author waits for (modal
+# submit -> "Confession envoyée."), "dm" runs afterwards in the outbox
+SUBMIT_STAGES = ("ack", "checks", "number", "publish", "persist", "reply", "total", "dm")
+
 
 @dataclass
 class Confession:
@@ -82,7 +97,7 @@ class ConfessionView(discord.ui.View):
             await interaction.response.send_message("Interaction invalide.", ephemeral=True)
             return
         # Récupérer auteur de la confession pour empêcher l'auto-réponse via bouton
-        conf = await Confessions.get_confession_by_message(msg.id)
+        conf = await Confessions.find_confession(interaction.client, msg.id)
         if not conf:
             await interaction.response.send_message("Confession introuvable.", ephemeral=True)
             return
@@ -102,7 +117,7 @@ class ConfessionView(discord.ui.View):
         if not msg:
             await interaction.response.send_message("Interaction invalide.", ephemeral=True)
             return
-        conf = await Confessions.get_confession_by_message(msg.id)
+        conf = await Confessions.find_confession(interaction.client, msg.id)
         if not conf:
             await interaction.response.send_message("Confession introuvable.", ephemeral=True)
             return
@@ -117,7 +132,7 @@ class ConfessionView(discord.ui.View):
         if not msg:
             await interaction.response.send_message("Interaction invalide.", ephemeral=True)
             return
-        conf = await Confessions.get_confession_by_message(msg.id)
+        conf = await Confessions.find_confession(interaction.client, msg.id)
         if not conf:
             await interaction.response.send_message("Confession introuvable.", ephemeral=True)
             return
@@ -136,52 +151,100 @@ def confession_embed(title: str, content: str) -> discord.Embed:
 class Confessions(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self._cooldown: dict[str, float] = {}
+        # Anti-spam, per (guild_id, user_id): one confession / 20 s, one reply / 15 s, one report / 20 s
+        self.limits: Dict[str, RateLimiter] = {
+            "confess": RateLimiter(1, 20),
+            "reply": RateLimiter(1, 15),
+            "report": RateLimiter(1, 20),
+        }
+        self.timings = StageTimings(SUBMIT_TIMING_SAMPLES)
+        # DMs of /confesser, delivered after the author got their answer
+        self.outbox = Outbox(self.timings)
+        # Staff log embeds, grouped up to 10 per message
+        self.logs = LogDispatcher()
+        # message_id -> Confession, for the buttons and modals of published confessions
+        self.cache: LRUCache[int, Confession] = LRUCache(config.confession_cache_size)
+        # guild_id -> banned user ids, loaded once and kept in step by /banconfession and /unbanconfession
+        self.banned: Dict[int, Set[int]] = {}
 
     async def cog_load(self) -> None:
+        await self._load_bans()
         # Enregistrer la vue persistante au démarrage
         self.bot.add_view(ConfessionView())
+        self.outbox.start()
+
+    async def cog_unload(self) -> None:
+        await self.outbox.stop()
+        await self.logs.stop()
 
-    def _check_cooldown(self, user_id: int, action: str, seconds: int = 30) -> bool:
-        key = f"{action}:{user_id}"
-        now = time.time()
-        last = self._cooldown.get(key, 0)
-        if now - last < seconds:
-            return False
-        self._cooldown[key] = now
-        return True
+    async def _load_bans(self) -> None:
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            async with conn.execute("SELECT guild_id, user_id FROM confession_bans WHERE active=1") as cur:
+                rows = await cur.fetchall()
+        self.banned = {}
+        for guild_id, user_id in rows:
+            self.banned.setdefault(int(guild_id), set()).add(int(user_id))
 
     @staticmethod
-    async def is_banned(guild_id: int, user_id: int) -> bool:
-        conn = await ensure_db()
-        async with conn.execute(
-            "SELECT 1 FROM confession_bans WHERE user_id=? AND guild_id=? AND active=1",
-            (user_id, guild_id),
-        ) as cur:
-            row = await cur.fetchone()
-        await conn.close()
+    async def check_banned(client: discord.Client, guild_id: int, user_id: int) -> bool:
+        cog = client.get_cog("Confessions")  # type: ignore[attr-defined]
+        if isinstance(cog, Confessions):
+            return user_id in cog.banned.get(guild_id, ())
+        return await Confessions.is_banned(client.db, guild_id, user_id)  # type: ignore[attr-defined]
+
+    @staticmethod
+    async def is_banned(db: Database, guild_id: int, user_id: int) -> bool:
+        async with db.acquire() as conn:
+            async with conn.execute(
+                "SELECT 1 FROM confession_bans WHERE user_id=? AND guild_id=? AND active=1",
+                (user_id, guild_id),
+            ) as cur:
+                row = await cur.fetchone()
         return bool(row)
 
     @staticmethod
-    async def get_confession_by_message(message_id: int) -> Optional[Confession]:
-        conn = await ensure_db()
-        async with conn.execute(
-            "SELECT id, author_id, guild_id, channel_id, message_id, thread_id, parent_id, content, deleted FROM confessions WHERE message_id=?",
-            (message_id,),
-        ) as cur:
-            row = await cur.fetchone()
-        await conn.close()
+    async def get_confession_by_message(db: Database, message_id: int) -> Optional[Confession]:
+        async with db.acquire() as conn:
+            async with conn.execute(
+                "SELECT id, author_id, guild_id, channel_id, message_id, thread_id, parent_id, content, deleted FROM confessions WHERE message_id=?",
+                (message_id,),
+            ) as cur:
+                row = await cur.fetchone()
         if not row:
             return None
         return Confession(*row)
 
     @staticmethod
-    async def log_to_channel(guild: discord.Guild, embed: discord.Embed) -> None:
+    async def find_confession(client: discord.Client, message_id: int) -> Optional[Confession]:
+        cog = client.get_cog("Confessions")  # type: ignore[attr-defined]
+        if not isinstance(cog, Confessions):
+            return await Confessions.get_confession_by_message(client.db, message_id)  # type: ignore[attr-defined]
+        conf = cog.cache.get(message_id)
+        if conf is None:
+            conf = await Confessions.get_confession_by_message(client.db, message_id)  # type: ignore[attr-defined]
+            if conf is not None:
+                cog.cache.set(message_id, conf)
+        return conf
+
+    @staticmethod
+    def forget_confession(client: discord.Client, message_id: int) -> None:
+        # Row changed in the database: the next lookup reloads it
+        cog = client.get_cog("Confessions")  # type: ignore[attr-defined]
+        if isinstance(cog, Confessions):
+            cog.cache.pop(message_id)
+
+    @staticmethod
+    async def log_to_channel(client: discord.Client, guild: discord.Guild, embed: discord.Embed, urgent: bool = False) -> None:
+        # urgent: the staff must see it now (reports), not after the batching delay
         log_id = config.confession_logs_id
         if not log_id:
             return
         ch = guild.get_channel(log_id)
         if isinstance(ch, discord.TextChannel):
+            cog = client.get_cog("Confessions")  # type: ignore[attr-defined]
+            if isinstance(cog, Confessions):
+                cog.logs.post(ch, embed, urgent=urgent)
+                return
             try:
                 await ch.send(embed=embed)
             except Exception:
@@ -201,57 +264,80 @@ class Confessions(commands.Cog):
 
     @staticmethod
     async def handle_confess_submit(interaction: discord.Interaction, content: str) -> None:
-        if not interaction.guild or not interaction.channel:
+        cog: Optional[Confessions] = interaction.client.get_cog("Confessions")  # type: ignore[attr-defined]
+        if not interaction.guild or not interaction.channel or not isinstance(cog, Confessions):
             await interaction.response.send_message("Commande indisponible ici.", ephemeral=True)
             return
-        if await Confessions.is_banned(interaction.guild.id, interaction.user.id):
-            await interaction.response.send_message("Vous êtes banni du système de confessions.", ephemeral=True)
+        started = time.perf_counter()
+        timings = cog.timings
+        # Acknowledge first: publishing and persisting must not eat into the 3 s interaction deadline
+        with timings.measure("ack"):
+            await interaction.response.defer(ephemeral=True, thinking=True)
+        guild, channel, author = interaction.guild, interaction.channel, interaction.user
+        db: Database = interaction.client.db  # type: ignore[attr-defined]
+        with timings.measure("checks"):
+            banned = await Confessions.check_banned(interaction.client, guild.id, author.id)
+        if banned:
+            await interaction.followup.send("Vous êtes banni du système de confessions.", ephemeral=True)
             return
         # Cooldown anti-spam
-        cog: Optional[Confessions] = interaction.client.get_cog("Confessions")  # type: ignore[attr-defined]
-        if isinstance(cog, Confessions) and not cog._check_cooldown(interaction.user.id, "confess", 20):
-            await interaction.response.send_message("Veuillez patienter quelques secondes avant de réessayer.", ephemeral=True)
+        if not cog.limits["confess"].hit((guild.id, author.id)):
+            await interaction.followup.send("Veuillez patienter quelques secondes avant de réessayer.", ephemeral=True)
             return
-        conn = await ensure_db()
-        conf_no = await next_counter(conn, f"confessions:{interaction.guild.id}")
-        await conn.close()
+        with timings.measure("number"):
+            conf_no = await db.counters.next(f"confessions:{guild.id}")
         title = f"Confession #{conf_no}"
         embed = confession_embed(title, content)
         view = ConfessionView()
         try:
-            msg = await interaction.channel.send(embed=embed, view=view)
+            with timings.measure("publish"):
+                msg = await channel.send(embed=embed, view=view)
         except discord.Forbidden:
-            await interaction.response.send_message("Permissions insuffisantes pour publier.", ephemeral=True)
+            await interaction.followup.send("Permissions insuffisantes pour publier.", ephemeral=True)
             return
-        # Persister
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT INTO confessions(id, author_id, guild_id, channel_id, message_id, thread_id, parent_id, content, deleted) VALUES(?,?,?,?,?,?,?,?,0)",
-            (conf_no, interaction.user.id, interaction.guild.id, interaction.channel.id, msg.id, None, None, content),
-        )
-        await conn.commit()
-        total = await get_counter(conn, f"user_conf_total:{interaction.guild.id}:{interaction.user.id}")
-        # incrémenter total perso
-        await conn.execute(
-            "INSERT INTO counters(name, value) VALUES(?, 1) ON CONFLICT(name) DO UPDATE SET value=value+1",
-            (f"user_conf_total:{interaction.guild.id}:{interaction.user.id}",),
-        )
-        await conn.commit()
-        await conn.close()
-        # DM auteur
+        # Persister: la confession et le total perso dans une seule transaction
+        total_key = f"user_conf_total:{guild.id}:{author.id}"
         try:
-            await interaction.user.send(
-                f"Votre confession #{conf_no} a été envoyée !\nVous avez désormais {total + 1} confession(s) au total."
-            )
-        except Exception:
-            pass
-        # Log enrichi
+            with timings.measure("persist"):
+                async with db.acquire() as conn:
+                    await conn.execute(
+                        "INSERT INTO confessions(id, author_id, guild_id, channel_id, message_id, thread_id, parent_id, content, deleted) VALUES(?,?,?,?,?,?,?,?,0)",
+                        (conf_no, author.id, guild.id, channel.id, msg.id, None, None, content),
+                    )
+                    async with conn.execute(
+                        "INSERT INTO counters(name, value) VALUES(?, 1) ON CONFLICT(name) DO UPDATE SET value=value+1 RETURNING value",
+                        (total_key,),
+                    ) as cur:
+                        row = await cur.fetchone()
+                    await conn.commit()
+        except sqlite3.Error as e:
+            # Unrecorded, its buttons would answer "introuvable": take it down rather than leave it half-published
+            logger.error(f"Confession #{conf_no} non enregistrée: {e}")
+            try:
+                await msg.delete()
+            except Exception:
+                pass
+            await interaction.followup.send("Impossible d'enregistrer la confession, réessayez.", ephemeral=True)
+            return
+        total = int(row[0]) if row else 1
+        cog.cache.set(msg.id, Confession(conf_no, author.id, guild.id, channel.id, msg.id, None, None, content, 0))
+        with timings.measure("reply"):
+            await interaction.followup.send("Confession envoyée.", ephemeral=True)
+        timings.record("total", (time.perf_counter() - started) * 1000)
+
+        # DM auteur (via la file d'envoi) et log enrichi, après la réponse
+        async def dm_author() -> None:
+            try:
+                await author.send(f"Votre confession #{conf_no} a été envoyée !\nVous avez désormais {total} confession(s) au total.")
+            except discord.HTTPException:
+                pass
+
         log = discord.Embed(title=title, description=content, color=discord.Color.blurple(), timestamp=discord.utils.utcnow())
-        log.add_field(name="Auteur", value=f"<@{interaction.user.id}> ({interaction.user}) | ID: {interaction.user.id}")
-        log.add_field(name="Salon", value=f"<#{interaction.channel.id}>", inline=True)
+        log.add_field(name="Auteur", value=f"<@{author.id}> ({author}) | ID: {author.id}")
+        log.add_field(name="Salon", value=f"<#{channel.id}>", inline=True)
         log.add_field(name="Lien", value=f"{msg.jump_url}", inline=False)
-        await Confessions.log_to_channel(interaction.guild, log)
-        await interaction.response.send_message("Confession envoyée.", ephemeral=True)
+        cog.outbox.put("dm", dm_author)
+        await Confessions.log_to_channel(interaction.client, guild, log)
 
     # ------------- Replies -------------
     @staticmethod
@@ -259,23 +345,22 @@ class Confessions(commands.Cog):
         if not interaction.guild or not interaction.channel:
             await interaction.response.send_message("Contexte invalide.", ephemeral=True)
             return
+        db: Database = interaction.client.db  # type: ignore[attr-defined]
         # Récupérer confession par message parent
-        parent = await Confessions.get_confession_by_message(parent_message_id)
+        parent = await Confessions.find_confession(interaction.client, parent_message_id)
         if not parent:
             await interaction.response.send_message("Confession introuvable.", ephemeral=True)
             return
-        if await Confessions.is_banned(interaction.guild.id, interaction.user.id):
+        if await Confessions.check_banned(interaction.client, interaction.guild.id, interaction.user.id):
             await interaction.response.send_message("Vous êtes banni du système de confessions.", ephemeral=True)
             return
         # Cooldown
         cog: Optional[Confessions] = interaction.client.get_cog("Confessions")  # type: ignore[attr-defined]
-        if isinstance(cog, Confessions) and not cog._check_cooldown(interaction.user.id, "reply", 15):
+        if isinstance(cog, Confessions) and not cog.limits["reply"].hit((interaction.guild.id, interaction.user.id)):
             await interaction.response.send_message("Trop rapide, réessayez dans un instant.", ephemeral=True)
             return
         # Numéro pour la réponse
-        conn = await ensure_db()
-        conf_no = await next_counter(conn, f"confessions:{interaction.guild.id}")
-        await conn.close()
+        conf_no = await db.counters.next(f"confessions:{interaction.guild.id}")
         title = f"Confession #{conf_no} — réponse à → #{parent.id}"
         embed = confession_embed(title, content)
         # Thread
@@ -304,12 +389,14 @@ class Confessions(commands.Cog):
             await interaction.response.send_message("Impossible d'envoyer la réponse.", ephemeral=True)
             return
         # Persister
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT INTO confessions(id, author_id, guild_id, channel_id, message_id, thread_id, parent_id, content, deleted) VALUES(?,?,?,?,?,?,?,?,0)",
-            (conf_no, interaction.user.id, interaction.guild.id, msg.channel.id, msg.id, thread.id if thread else None, parent.id, content),
-        )
-        await conn.commit()
+        async with db.acquire() as conn:
+            await conn.execute(
+                "INSERT INTO confessions(id, author_id, guild_id, channel_id, message_id, thread_id, parent_id, content, deleted) VALUES(?,?,?,?,?,?,?,?,0)",
+                (conf_no, interaction.user.id, interaction.guild.id, msg.channel.id, msg.id, thread.id if thread else None, parent.id, content),
+            )
+            await conn.commit()
+        if isinstance(cog, Confessions):
+            cog.cache.set(msg.id, Confession(conf_no, interaction.user.id, interaction.guild.id, msg.channel.id, msg.id, thread.id if thread else None, parent.id, content, 0))
         # DM au propriétaire de la confession initiale
         try:
             user = interaction.guild.get_member(parent.author_id)
@@ -322,7 +409,7 @@ class Confessions(commands.Cog):
         log.add_field(name="Répondant", value=f"<@{interaction.user.id}> ({interaction.user}) | ID: {interaction.user.id}")
         log.add_field(name="Salon", value=f"<#{msg.channel.id}>", inline=True)
         log.add_field(name="Lien", value=f"{msg.jump_url}", inline=False)
-        await Confessions.log_to_channel(interaction.guild, log)
+        await Confessions.log_to_channel(interaction.client, interaction.guild, log)
         await interaction.response.send_message("Réponse envoyée.", ephemeral=True)
 
     # ------------- Reports -------------
@@ -331,13 +418,13 @@ class Confessions(commands.Cog):
         if not interaction.guild:
             await interaction.response.send_message("Contexte invalide.", ephemeral=True)
             return
-        conf = await Confessions.get_confession_by_message(message_id)
+        conf = await Confessions.find_confession(interaction.client, message_id)
         if not conf:
             await interaction.response.send_message("Confession introuvable.", ephemeral=True)
             return
         # Cooldown léger
         cog: Optional[Confessions] = interaction.client.get_cog("Confessions")  # type: ignore[attr-defined]
-        if isinstance(cog, Confessions) and not cog._check_cooldown(interaction.user.id, "report", 20):
+        if isinstance(cog, Confessions) and not cog.limits["report"].hit((interaction.guild.id, interaction.user.id)):
             await interaction.response.send_message("Merci d'attendre un peu avant un nouveau signalement.", ephemeral=True)
             return
         e = discord.Embed(title=f"Signalement Confession #{conf.id}", color=discord.Color.red())
@@ -346,7 +433,7 @@ class Confessions(commands.Cog):
         e.add_field(name="Raison", value=reason or "(aucune)", inline=False)
         e.add_field(name="Salon", value=f"<#{conf.channel_id}>")
         e.add_field(name="Lien", value=f"https://discord.com/channels/{conf.guild_id}/{conf.channel_id}/{conf.message_id}", inline=False)
-        await Confessions.log_to_channel(interaction.guild, e)
+        await Confessions.log_to_channel(interaction.client, interaction.guild, e, urgent=True)
         await interaction.response.send_message("Signalement transmis au staff.", ephemeral=True)
 
     # ------------- Edit/Delete -------------
@@ -355,7 +442,8 @@ class Confessions(commands.Cog):
         if not interaction.guild or not interaction.channel:
             await interaction.response.send_message("Contexte invalide.", ephemeral=True)
             return
-        conf = await Confessions.get_confession_by_message(message_id)
+        db: Database = interaction.client.db  # type: ignore[attr-defined]
+        conf = await Confessions.find_confession(interaction.client, message_id)
         if not conf:
             await interaction.response.send_message("Confession introuvable.", ephemeral=True)
             return
@@ -388,12 +476,12 @@ class Confessions(commands.Cog):
             e.add_field(name="Auteur", value=f"<@{conf.author_id}>")
             e.add_field(name="Ancien contenu", value=conf.content[:1000] or "(vide)", inline=False)
             e.add_field(name="Nouveau contenu", value=new_content[:1000] or "(vide)", inline=False)
-            await Confessions.log_to_channel(interaction.guild, e)
+            await Confessions.log_to_channel(interaction.client, interaction.guild, e)
             # Persist
-            conn = await ensure_db()
-            await conn.execute("UPDATE confessions SET content=? WHERE id=?", (new_content, conf.id))
-            await conn.commit()
-            await conn.close()
+            async with db.acquire() as conn:
+                await conn.execute("UPDATE confessions SET content=? WHERE id=?", (new_content, conf.id))
+                await conn.commit()
+            Confessions.forget_confession(interaction.client, conf.message_id)
             await interaction.response.send_message("Confession modifiée.", ephemeral=True)
         else:
             # Suppression
@@ -406,11 +494,11 @@ class Confessions(commands.Cog):
             e.add_field(name="Auteur", value=f"<@{conf.author_id}>")
             e.add_field(name="Raison", value=delete_reason or "(aucune)")
             e.add_field(name="Contenu initial", value=conf.content[:1000] or "(vide)", inline=False)
-            await Confessions.log_to_channel(interaction.guild, e)
-            conn = await ensure_db()
-            await conn.execute("UPDATE confessions SET deleted=1 WHERE id=?", (conf.id,))
-            await conn.commit()
-            await conn.close()
+            await Confessions.log_to_channel(interaction.client, interaction.guild, e)
+            async with db.acquire() as conn:
+                await conn.execute("UPDATE confessions SET deleted=1 WHERE id=?", (conf.id,))
+                await conn.commit()
+            Confessions.forget_confession(interaction.client, conf.message_id)
             try:
                 user = interaction.guild.get_member(conf.author_id)
                 if user:
@@ -419,19 +507,46 @@ class Confessions(commands.Cog):
                 pass
             await interaction.response.send_message("Confession supprimée.", ephemeral=True)
 
+    # ------------- Stats -------------
+    def build_stats_embed(self) -> discord.Embed:
+        e = discord.Embed(title="Confessions — statistiques", color=discord.Color.blurple())
+        lines = []
+        for stage in SUBMIT_STAGES:
+            summary = self.timings.summary(stage)
+            if summary:
+                p50, p99, n = summary
+                lines.append(f"- {stage}: p50 {p50:.0f} | p99 {p99:.0f} (n={n})")
+        e.add_field(name="/confesser par étape (ms)", value="\n".join(lines) or "(aucune mesure)", inline=False)
+        e.add_field(name="Cache des confessions", value=f"{len(self.cache)}/{self.cache.maxsize}, {self.cache.hits} succès / {self.cache.misses} échecs, {self.cache.evictions} évincée(s)")
+        e.add_field(name="Bannis des confessions", value=f"{sum(len(b) for b in self.banned.values())} sur {len(self.banned)} serveur(s)")
+        e.add_field(
+            name="Anti-spam",
+            value="\n".join(f"- {action}: {len(limiter)} actif(s), {limiter.rejected} refus / {limiter.allowed} accepté(s)" for action, limiter in self.limits.items()),
+            inline=False,
+        )
+        e.add_field(name="File d'envoi (DM)", value=f"{len(self.outbox)} en attente, {self.outbox.delivered} envoyé(s), {self.outbox.failed} échec(s)")
+        e.add_field(name="Logs staff", value=f"{self.logs.embeds} log(s) en {self.logs.messages} message(s), {len(self.logs)} en attente, {self.logs.failed} échec(s)")
+        e.set_footer(text="Gentle Bernard")
+        return e
+
+    @app_commands.command(name="confessionstats", description="Statistiques internes des confessions (staff)")
+    @app_is_staff()
+    async def confession_stats(self, interaction: discord.Interaction):
+        await interaction.response.send_message(embed=self.build_stats_embed(), ephemeral=True)
+
     # ------------- Ban/Unban confession -------------
     @app_commands.command(name="banconfession", description="Empêcher un membre d'utiliser les confessions")
     @app_is_staff()
     @app_commands.describe(membre="Membre", raison="Raison")
     async def ban_confession(self, interaction: discord.Interaction, membre: discord.Member, raison: Optional[str] = None):
         await interaction.response.defer(ephemeral=True)
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT OR REPLACE INTO confession_bans(user_id, guild_id, reason, moderator_id, active) VALUES(?,?,?,?,1)",
-            (membre.id, interaction.guild.id, raison, interaction.user.id),
-        )
-        await conn.commit()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            await conn.execute(
+                "INSERT OR REPLACE INTO confession_bans(user_id, guild_id, reason, moderator_id, active) VALUES(?,?,?,?,1)",
+                (membre.id, interaction.guild.id, raison, interaction.user.id),
+            )
+            await conn.commit()
+        self.banned.setdefault(interaction.guild.id, set()).add(membre.id)
         try:
             await membre.send(f"Vous avez été banni du système de confessions sur {interaction.guild.name}. Raison: {raison or 'Aucune'}")
         except Exception:
@@ -443,13 +558,17 @@ class Confessions(commands.Cog):
     @app_commands.describe(membre="Membre")
     async def unban_confession(self, interaction: discord.Interaction, membre: discord.Member):
         await interaction.response.defer(ephemeral=True)
-        conn = await ensure_db()
-        await conn.execute(
-            "UPDATE confession_bans SET active=0 WHERE user_id=? AND guild_id=?",
-            (membre.id, interaction.guild.id),
-        )
-        await conn.commit()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            await conn.execute(
+                "UPDATE confession_bans SET active=0 WHERE user_id=? AND guild_id=?",
+                (membre.id, interaction.guild.id),
+            )
+            await conn.commit()
+        banned = self.banned.get(interaction.guild.id)
+        if banned is not None:
+            banned.discard(membre.id)
+            if not banned:
+                del self.banned[interaction.guild.id]
         try:
             await membre.send(f"Votre accès au système de confessions a été rétabli sur {interaction.guild.name}.")
         except Exception:
@@ -8,7 +8,6 @@ import random
 
 from utils.config import config
 from utils.permissions import is_admin
-from utils.db import ensure_db
 
 
 WELCOME_TITLES = [
@@ -66,13 +65,12 @@ class Greetings(commands.Cog):
         self.bot = bot
 
     async def _get_settings(self, guild_id: int) -> tuple[bool, Optional[int], Optional[int]]:
-        conn = await ensure_db()
-        async with conn.execute(
-            "SELECT enabled, welcome_channel_id, goodbye_channel_id FROM welcome_settings WHERE guild_id=?",
-            (guild_id,),
-        ) as cur:
-            row = await cur.fetchone()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            async with conn.execute(
+                "SELECT enabled, welcome_channel_id, goodbye_channel_id FROM welcome_settings WHERE guild_id=?",
+                (guild_id,),
+            ) as cur:
+                row = await cur.fetchone()
         if not row:
             # Default: enabled, fallback to config
             return True, getattr(config, "welcome_channel_id", None), getattr(config, "goodbye_channel_id", None)
@@ -89,25 +87,23 @@ class Greetings(commands.Cog):
     @commands.command(name="welcome_on", help="Activer les messages d'arrivée et de départ (admin)")
     @is_admin()
     async def welcome_on(self, ctx: commands.Context):
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,?,NULL,NULL) ON CONFLICT(guild_id) DO UPDATE SET enabled=1, updated_at=CURRENT_TIMESTAMP",
-            (ctx.guild.id, 1),  # type: ignore[union-attr]
-        )
-        await conn.commit()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            await conn.execute(
+                "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,?,NULL,NULL) ON CONFLICT(guild_id) DO UPDATE SET enabled=1, updated_at=CURRENT_TIMESTAMP",
+                (ctx.guild.id, 1),  # type: ignore[union-attr]
+            )
+            await conn.commit()
         await ctx.send("Système de bienvenue activé.")
 
     @commands.command(name="welcome_off", help="Désactiver les messages d'arrivée et de départ (admin)")
     @is_admin()
     async def welcome_off(self, ctx: commands.Context):
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,?,NULL,NULL) ON CONFLICT(guild_id) DO UPDATE SET enabled=0, updated_at=CURRENT_TIMESTAMP",
-            (ctx.guild.id, 0),  # type: ignore[union-attr]
-        )
-        await conn.commit()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            await conn.execute(
+                "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,?,NULL,NULL) ON CONFLICT(guild_id) DO UPDATE SET enabled=0, updated_at=CURRENT_TIMESTAMP",
+                (ctx.guild.id, 0),  # type: ignore[union-attr]
+            )
+            await conn.commit()
         await ctx.send("Système de bienvenue désactivé.")
 
     @commands.command(name="welcome_arrive_set", help="Définir le salon d'arrivée (admin)")
@@ -117,13 +113,12 @@ class Greetings(commands.Cog):
         if not channel:
             await ctx.send("Spécifiez un salon texte.")
             return
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,1,?,NULL) ON CONFLICT(guild_id) DO UPDATE SET welcome_channel_id=excluded.welcome_channel_id, updated_at=CURRENT_TIMESTAMP",
-            (ctx.guild.id, channel.id),  # type: ignore[union-attr]
-        )
-        await conn.commit()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            await conn.execute(
+                "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,1,?,NULL) ON CONFLICT(guild_id) DO UPDATE SET welcome_channel_id=excluded.welcome_channel_id, updated_at=CURRENT_TIMESTAMP",
+                (ctx.guild.id, channel.id),  # type: ignore[union-attr]
+            )
+            await conn.commit()
         await ctx.send(f"Salon d'arrivée défini sur {channel.mention}.")
 
     @commands.command(name="welcome_depart_set", help="Définir le salon de départ (admin)")
@@ -133,13 +128,12 @@ class Greetings(commands.Cog):
         if not channel:
             await ctx.send("Spécifiez un salon texte.")
             return
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,1,NULL,?) ON CONFLICT(guild_id) DO UPDATE SET goodbye_channel_id=excluded.goodbye_channel_id, updated_at=CURRENT_TIMESTAMP",
-            (ctx.guild.id, channel.id),  # type: ignore[union-attr]
-        )
-        await conn.commit()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            await conn.execute(
+                "INSERT INTO welcome_settings(guild_id, enabled, welcome_channel_id, goodbye_channel_id) VALUES(?,1,NULL,?) ON CONFLICT(guild_id) DO UPDATE SET goodbye_channel_id=excluded.goodbye_channel_id, updated_at=CURRENT_TIMESTAMP",
+                (ctx.guild.id, channel.id),  # type: ignore[union-attr]
+            )
+            await conn.commit()
         await ctx.send(f"Salon de départ défini sur {channel.mention}.")
 
     @commands.Cog.listener()
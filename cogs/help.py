@@ -174,6 +174,17 @@ HELP_ENTRIES = [
         "examples": ["/unbanconfession membre:@User"],
         "permissions": "Staff",
     },
+    {
+        "key": "confessionstats",
+        "label": "confessionstats -> statistiques des confessions",
+        "type": "slash",
+        "title": "confessionstats",
+        "summary": "Affiche les compteurs internes du système de confessions.",
+        "usage": "/confessionstats",
+        "details": "Durées p50/p99 de chaque étape de /confesser (accusé de réception, vérifications, numéro, publication, enregistrement, réponse, total côté auteur, DM en arrière-plan), cache des confessions (succès / échecs), anti-spam (clés actives, refus), file d'envoi des DM et logs staff (embeds regroupés par message).",
+        "examples": ["/confessionstats"],
+        "permissions": "Staff",
+    },
     {
         "key": "hub create",
         "label": "hub create -> créer un hub voc temp",
@@ -182,7 +193,9 @@ HELP_ENTRIES = [
         "summary": "Assistant multi-étapes pour créer un hub de salons vocaux temporaires.",
         "usage": "+hub create",
         "details": (
-            "Choix du nom, catégorie du hub, catégorie de création des salons, et permissions du propriétaire.\n"
+            "Choix du nom, catégorie du hub, catégorie de création des salons, permissions du propriétaire\n"
+            "nombre de salons de réserve pré-créés (attribués instantanément)\n"
+            "et emplacement du panneau de contrôle (salon texte dédié ou chat du salon vocal).\n"
             "Remplace +voctemp."
         ),
         "examples": ["+hub create"],
@@ -196,12 +209,24 @@ HELP_ENTRIES = [
         "summary": "Interface pour renommer le hub et modifier les permissions.",
         "usage": "+hub manage {id}",
         "details": (
-            "Boutons: modifier le nom (prompt), modifier les permissions (toggles).\n"
+            "Boutons: modifier le nom (prompt), modifier les permissions (toggles), salons de réserve,\n"
+            "emplacement du panneau (salon texte dédié / chat du salon vocal, pour les nouveaux salons).\n"
             "Remplace +voctempmodif."
         ),
         "examples": ["+hub manage 1"],
         "permissions": "Admin",
     },
+    {
+        "key": "hub stats",
+        "label": "hub stats -> statistiques des salons voc temp",
+        "type": "prefix",
+        "title": "hub stats",
+        "summary": "Affiche les compteurs internes du système de salons vocaux temporaires.",
+        "usage": "+hub stats",
+        "details": "Salons actifs, hubs, salons de réserve, suppressions en attente, file de création (attente p50/p99), créations évitées (doublon / anti-rebond / limite par membre / abandon), et répartition des événements vocaux reçus (join / leave / move / state).",
+        "examples": ["+hub stats"],
+        "permissions": "Admin",
+    },
     {
         "key": "user info",
         "label": "user info -> informations sur un utilisateur",
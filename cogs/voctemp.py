@@ -1,17 +1,29 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
-from typing import Optional, Dict, Tuple
+import functools
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+import logging
+import re
+from typing import Awaitable, Callable, Optional, Deque, Dict, List, Tuple
 import time
 
 import discord
 from discord.ext import commands
 from discord import app_commands
 
-from utils.db import ensure_db
+from utils.admission import AdmissionQueue
+from utils.cache import TTLStore
+from utils.channel_edits import ChannelEditQueue
+from utils.config import config
+from utils.durations import humanize_delta
 from utils.embeds import success_embed, error_embed
 from utils.permissions import is_admin, app_is_admin
+from utils.locks import KeyedLock
+from utils.metrics import percentile
+from utils.scheduler import DeadlineScheduler
 
 # Bitmask permissions
 PERM_KICK = 1 << 0
@@ -33,6 +45,67 @@ ALL_FLAGS = [
 # Fixed channel where ownership transfer proposals are posted
 TRANSFER_CHANNEL_ID = 1438229159594692718
 
+# Pre-created hidden voice channels per hub (spare pool)
+MAX_SPARE_POOL = 5
+SPARE_CHANNEL_NAME = "réserve"
+
+logger = logging.getLogger("cigaming_bot.voctemp")
+
+
+# Seconds an emptied temp room is kept before deletion
+EMPTY_ROOM_TIMEOUT = 60
+
+# Ownership transfer state: rooms tracked at once, seconds kept after the last change
+TRANSFER_STATE_MAX = 1024
+TRANSFER_STATE_TTL = 600.0
+
+# Hub joins by the same member within this many seconds of a creation reuse the room
+CREATE_DEBOUNCE = 5.0
+# Rooms one member may own at once (empty rooms awaiting deletion included)
+MAX_ROOMS_PER_OWNER = 2
+# Reasons a hub join did not create a room (see VoiceTemp._join_hub)
+SUPPRESSED_REASONS = ("duplicate", "debounce", "cap", "abandoned")
+
+# Room creation admission wait samples kept for +hub stats
+ADMISSION_WAIT_SAMPLES = 500
+# Seconds a queued hub join waits before the member is told they are in the queue
+WAIT_NOTICE_DELAY = 2.0
+
+# Seconds a panel interaction waits for its channel edit before answering "queued"
+EDIT_REPLY_TIMEOUT = 2.0
+
+# Companion channels deleted in parallel during reconciliation
+RECONCILE_CONCURRENCY = 5
+
+# Join-to-moved latency samples kept for +hub stats
+MOVE_LATENCY_SAMPLES = 500
+
+# Voice state update classes
+VOICE_EVENT_JOIN = "join"
+VOICE_EVENT_LEAVE = "leave"
+VOICE_EVENT_MOVE = "move"
+VOICE_EVENT_STATE = "state"  # same channel before/after: mute, deafen, stream, video...
+VOICE_EVENT_KINDS = (VOICE_EVENT_JOIN, VOICE_EVENT_LEAVE, VOICE_EVENT_MOVE, VOICE_EVENT_STATE)
+
+
+def classify_voice_event(before: Optional[discord.VoiceState], after: Optional[discord.VoiceState]) -> str:
+    before_id = before.channel.id if before and before.channel else None
+    after_id = after.channel.id if after and after.channel else None
+    if before_id == after_id:
+        return VOICE_EVENT_STATE
+    if before_id is None:
+        return VOICE_EVENT_JOIN
+    if after_id is None:
+        return VOICE_EVENT_LEAVE
+    return VOICE_EVENT_MOVE
+
+
+def stored_view_count(client: discord.Client) -> int:
+    """Message-bound and persistent views discord.py is keeping alive for this client."""
+    # The library has no public count: this is the one place that reads its private ViewStore
+    store = getattr(getattr(client, "_connection", None), "_view_store", None)
+    return len(getattr(store, "_views", {}))
+
 
 def has_flag(mask: int, flag: int) -> bool:
     return (mask & flag) == flag
@@ -49,6 +122,12 @@ class HubConfigState:
     voice_category_id: Optional[int] = None
     name: Optional[str] = None
     perms_mask: int = 0
+    spare_pool_size: int = 0
+    panel_in_voice: bool = False
+
+
+def panel_mode_label(panel_in_voice: bool) -> str:
+    return "chat du salon vocal" if panel_in_voice else "salon texte dédié"
 
 
 class CategorySelect(discord.ui.ChannelSelect):
@@ -83,6 +162,26 @@ class NameModal(discord.ui.Modal, title="Nom du hub vocal"):
         await interaction.response.send_message("Nom enregistré.", ephemeral=True)
 
 
+class SparePoolModal(discord.ui.Modal, title="Salons de réserve"):
+    def __init__(self, state: HubConfigState, on_saved: Optional[Callable[[discord.Interaction], Awaitable[None]]] = None):
+        super().__init__()
+        self.state = state
+        self.on_saved = on_saved
+        self.size = discord.ui.TextInput(label=f"Salons pré-créés (0 à {MAX_SPARE_POOL})", max_length=2, default=str(state.spare_pool_size))
+        self.add_item(self.size)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        value = str(self.size.value).strip()
+        if not value.isdigit():
+            await interaction.response.send_message("Valeur invalide.", ephemeral=True)
+            return
+        self.state.spare_pool_size = min(MAX_SPARE_POOL, int(value))
+        if self.on_saved:
+            await self.on_saved(interaction)
+            return
+        await interaction.response.send_message(f"Réserve: {self.state.spare_pool_size} salon(s).", ephemeral=True)
+
+
 class PermsToggles(discord.ui.View):
     def __init__(self, state: HubConfigState):
         super().__init__(timeout=300)
@@ -122,6 +221,8 @@ def build_config_embed(state: HubConfigState) -> discord.Embed:
     e.add_field(name="Nom", value=state.name or "(à définir)")
     e.add_field(name="Catégorie du hub", value=f"<#{state.hub_category_id}>" if state.hub_category_id else "(à choisir)")
     e.add_field(name="Catégorie des salons vocaux", value=f"<#{state.voice_category_id}>" if state.voice_category_id else "(à choisir)")
+    e.add_field(name="Salons de réserve", value=str(state.spare_pool_size))
+    e.add_field(name="Panneau de contrôle", value=panel_mode_label(state.panel_in_voice))
     e.set_footer(text="Gentle Bernard")
     return e
 
@@ -139,7 +240,7 @@ class HubWizard(discord.ui.View):
     pass  # Placeholder: legacy wizard removed in favor of multi-étapes
 
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     id: int
     guild_id: int
@@ -149,21 +250,572 @@ class Room:
     text_channel_id: Optional[int]
     control_message_id: Optional[int]
     active: int
+    # Owner permissions of the hub the room was created from
+    perms_mask: int = 0
+
+
+@dataclass(slots=True)
+class TransferState:
+    owner_id: int
+    pending: Optional[int] = None
+    last_proposal_ts: float = 0.0
+    last_target_id: Optional[int] = None
+    refuse_count: int = 0
+    cooldown_until: float = 0.0
+
+
+@dataclass(slots=True)
+class SparePool:
+    guild_id: int
+    category_id: Optional[int]
+    size: int = 0
+    # Hidden voice channels ready to be handed out, oldest first
+    channels: Deque[int] = field(default_factory=deque)
+
+
+# ---------------- Room control panel ----------------
+# action -> (label, style, row); the custom_id carries the voice channel id
+PANEL_BUTTONS: Dict[str, Tuple[str, discord.ButtonStyle, int]] = {
+    "kick": ("Expulser", discord.ButtonStyle.danger, 0),
+    "mute": ("Mute", discord.ButtonStyle.secondary, 0),
+    "unmute": ("Unmute", discord.ButtonStyle.secondary, 0),
+    "rename": ("Renommer", discord.ButtonStyle.primary, 1),
+    "limit": ("Limiter", discord.ButtonStyle.secondary, 1),
+    "lock": ("Lock/Unlock", discord.ButtonStyle.secondary, 1),
+    "transfer": ("Passer la propriété", discord.ButtonStyle.success, 2),
+}
+
+
+def voice_id_from_panel_embed(message: Optional[discord.Message]) -> int:
+    # Legacy panels (custom_id "voctemp:<action>:0") only carry the voice id in their embed
+    try:
+        if not message or not message.embeds:
+            return 0
+        for f in message.embeds[0].fields:
+            if f.name.lower() == "salon vocal":
+                # value like <#123456789>
+                digits = "".join(ch for ch in f.value if ch.isdigit())
+                return int(digits) if digits else 0
+    except Exception:
+        return 0
+    return 0
+
+
+class PanelButton(discord.ui.DynamicItem[discord.ui.Button], template=r"voctemp:(?P<action>kick|mute|unmute|rename|limit|lock|transfer):(?P<voice_id>[0-9]+)"):
+    def __init__(self, action: str, voice_id: int, locked: bool = False) -> None:
+        label, style, row = PANEL_BUTTONS[action]
+        if action == "lock":
+            # green if locked, gray if unlocked
+            style = discord.ButtonStyle.success if locked else discord.ButtonStyle.secondary
+        super().__init__(discord.ui.Button(label=label, style=style, row=row, custom_id=f"voctemp:{action}:{voice_id}"))
+        self.action = action
+        self.voice_id = voice_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str]) -> "PanelButton":
+        return cls(match["action"], int(match["voice_id"]))
+
+    async def callback(self, interaction: discord.Interaction) -> None:
+        cog = interaction.client.get_cog("VoiceTemp")  # type: ignore[attr-defined]
+        if not isinstance(cog, VoiceTemp):
+            await interaction.response.send_message("Panneau indisponible.", ephemeral=True)
+            return
+        voice_id = self.voice_id or voice_id_from_panel_embed(interaction.message)
+        await cog.route_panel_action(interaction, self.action, voice_id)
+
+
+class RenameModal(discord.ui.Modal, title="Renommer le salon"):
+    def __init__(self, cog: "VoiceTemp", voice_id: int):
+        super().__init__()
+        self.cog = cog
+        self.voice_id = voice_id
+        self.name = discord.ui.TextInput(label="Nouveau nom", max_length=90)
+        self.add_item(self.name)
+
+    async def on_submit(self, i: discord.Interaction):
+        owner = await self.cog._ensure_owner(i, self.voice_id)
+        if not owner or not i.guild:
+            return
+        vc = i.guild.get_channel(self.voice_id)
+        if isinstance(vc, discord.VoiceChannel):
+            await self.cog._send_edit(i, vc, "Nom mis à jour.", "Impossible de renommer.", name=str(self.name.value)[:90])
+
+
+class LimitModal(discord.ui.Modal, title="Limiter le salon"):
+    def __init__(self, cog: "VoiceTemp", voice_id: int):
+        super().__init__()
+        self.cog = cog
+        self.voice_id = voice_id
+        self.val = discord.ui.TextInput(label="Limite (0 pour illimité)", max_length=3)
+        self.add_item(self.val)
+
+    async def on_submit(self, i: discord.Interaction):
+        owner = await self.cog._ensure_owner(i, self.voice_id)
+        if not owner or not i.guild:
+            return
+        try:
+            limit = max(0, min(99, int(str(self.val.value))))
+        except Exception:
+            await i.response.send_message("Valeur invalide.", ephemeral=True)
+            return
+        vc = i.guild.get_channel(self.voice_id)
+        if isinstance(vc, discord.VoiceChannel):
+            await self.cog._send_edit(i, vc, "Limite mise à jour.", "Impossible de mettre à jour la limite.", user_limit=limit)
+
+
+# ----- Actions sur membres: Kick / Mute / Unmute -----
+class SelectMemberView(discord.ui.View):
+    def __init__(self, cog: "VoiceTemp", action: str, voice_id: int):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.action = action
+        self.voice_id = voice_id
+        self.add_item(self._make_select())
+
+    def _make_select(self) -> discord.ui.UserSelect:
+        select = discord.ui.UserSelect(min_values=1, max_values=1)
+        async def on_select(inter: discord.Interaction):
+            user = select.values[0]
+            if not inter.guild:
+                await inter.response.send_message("Contexte invalide.", ephemeral=True)
+                return
+            member = inter.guild.get_member(user.id)
+            owner = await self.cog._ensure_owner(inter, self.voice_id)
+            if not owner:
+                return
+            vc = inter.guild.get_channel(self.voice_id)
+            if not isinstance(vc, discord.VoiceChannel) or member not in vc.members:
+                await inter.response.send_message("Le membre n'est pas dans votre salon", ephemeral=True)
+                return
+            # Show ephemeral confirmation view
+            await inter.response.send_message(
+                content=f"Confirmer l'action {self.action} sur {member.mention} ?",
+                view=ConfirmActionView(self.cog, self.action, self.voice_id, member.id),
+                ephemeral=True,
+            )
+        select.callback = on_select  # type: ignore[assignment]
+        return select
+
+
+class ConfirmActionView(discord.ui.View):
+    def __init__(self, cog: "VoiceTemp", action: str, voice_id: int, target_id: int):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.action = action
+        self.voice_id = voice_id
+        self.target_id = target_id
+        self.add_item(self._btn_confirm())
+        self.add_item(self._btn_cancel())
+
+    def _btn_confirm(self) -> discord.ui.Button:
+        async def on_click(inter: discord.Interaction):
+            if not inter.guild:
+                await inter.response.send_message("Contexte invalide.", ephemeral=True)
+                return
+            owner = await self.cog._ensure_owner(inter, self.voice_id)
+            if not owner:
+                return
+            member = inter.guild.get_member(self.target_id)
+            vc = inter.guild.get_channel(self.voice_id)
+            if not member or not isinstance(vc, discord.VoiceChannel) or member not in vc.members:
+                await inter.response.edit_message(content="Le membre n'est pas dans votre salon.", view=None)
+                return
+            try:
+                if self.action == 'kick':
+                    await member.move_to(None, reason="Expulsion du salon vocal temp")
+                elif self.action == 'mute':
+                    await member.edit(mute=True, reason="Mute salon vocal temp")
+                elif self.action == 'unmute':
+                    await member.edit(mute=False, reason="Unmute salon vocal temp")
+                await inter.response.edit_message(content=f"Action {self.action} effectuée pour {member.mention}.", view=None)
+            except Exception:
+                await inter.response.edit_message(content="Action impossible.", view=None)
+        b = discord.ui.Button(label="Confirmer", style=discord.ButtonStyle.danger if self.action == 'kick' else discord.ButtonStyle.success)
+        b.callback = on_click  # type: ignore[assignment]
+        return b
+
+    def _btn_cancel(self) -> discord.ui.Button:
+        async def on_click(inter: discord.Interaction):
+            await inter.response.edit_message(content="Action annulée.", view=None)
+        b = discord.ui.Button(label="Annuler", style=discord.ButtonStyle.secondary)
+        b.callback = on_click  # type: ignore[assignment]
+        return b
+
+
+# ----- Passer la propriété -----
+class TransferTargetView(discord.ui.View):
+    def __init__(self, cog: "VoiceTemp", voice_id: int, owner: discord.Member, vc: discord.VoiceChannel, st: TransferState, now: float):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.voice_id = voice_id
+        self.owner = owner
+        self.vc = vc
+        self.st = st
+        self.now = now
+        self.add_item(self._make_select())
+
+    def _make_select(self) -> discord.ui.UserSelect:
+        select = discord.ui.UserSelect(min_values=1, max_values=1)
+        async def on_select(i: discord.Interaction):
+            user = select.values[0]
+            if not i.guild:
+                await i.response.send_message("Contexte invalide.", ephemeral=True)
+                return
+            st = self.st
+            target = i.guild.get_member(user.id)
+            if not target or target.id == self.owner.id or target not in self.vc.members:
+                await i.response.send_message("Cible invalide.", ephemeral=True)
+                return
+            # 30s between different proposals
+            if self.now - st.last_proposal_ts < 30 and st.last_target_id != target.id:
+                await i.response.send_message("Attendez 30 secondes avant une nouvelle proposition à une autre personne.", ephemeral=True)
+                return
+            # Create proposal message in the fixed transfer channel pinging target
+            ch = i.guild.get_channel(TRANSFER_CHANNEL_ID)
+            if not isinstance(ch, discord.TextChannel):
+                await i.response.send_message("Salon de transfert introuvable.", ephemeral=True)
+                return
+            embed = discord.Embed(title="Proposition de transfert de propriété", description=f"{target.mention}\n{self.owner.mention} souhaite vous transférer la propriété du salon \"{self.vc.name}\".", color=discord.Color.blurple())
+            embed.set_footer(text="Expire dans 60 secondes")
+            view = TransferAcceptView(self.cog, self.voice_id, self.owner, target, self.vc, st)
+            msg = await ch.send(content=target.mention, embed=embed, view=view, allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False))
+            view.message = msg
+            # Mark pending
+            st.pending = target.id
+            st.owner_id = self.owner.id
+            st.last_proposal_ts = self.now
+            st.last_target_id = target.id
+            self.cog.save_transfer_state(self.voice_id, st)
+            await i.response.send_message("Proposition envoyée.", ephemeral=True)
+        select.callback = on_select  # type: ignore[assignment]
+        return select
+
+
+class TransferAcceptView(discord.ui.View):
+    # Accept / refuse buttons, usable by the proposed new owner only
+    def __init__(self, cog: "VoiceTemp", voice_id: int, owner: discord.Member, target: discord.Member, vc: discord.VoiceChannel, st: TransferState):
+        super().__init__(timeout=60)
+        self.cog = cog
+        self.voice_id = voice_id
+        self.owner = owner
+        self.target = target
+        self.vc = vc
+        self.st = st
+        self.message: Optional[discord.Message] = None
+
+    async def interaction_check(self, it: discord.Interaction) -> bool:
+        return it.user.id == self.target.id
+
+    @discord.ui.button(label="Accepter", style=discord.ButtonStyle.success)
+    async def accept(self, it: discord.Interaction, b: discord.ui.Button):  # type: ignore[override]
+        cog, st, target, vid = self.cog, self.st, self.target, self.voice_id
+        # Update DB owner
+        async with cog.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            await conn.execute("UPDATE voctemp_rooms SET owner_id=? WHERE guild_id=? AND voice_channel_id=? AND active=1", (target.id, it.guild.id, vid))
+            await conn.commit()
+        room = cog.get_room(it.guild.id, vid)
+        if room:
+            room.owner_id = target.id
+        # Update panel visibility: remove old owner, add new owner
+        panel_ch = it.guild.get_channel(room.text_channel_id) if room and room.text_channel_id else None
+        if isinstance(panel_ch, discord.TextChannel):
+            try:
+                await panel_ch.set_permissions(self.owner, view_channel=False)
+                await panel_ch.set_permissions(target, view_channel=True, send_messages=False)
+            except Exception:
+                pass
+        # Clear state
+        st.pending = None
+        st.refuse_count = 0
+        st.last_proposal_ts = time.time()
+        st.last_target_id = target.id
+        cog.save_transfer_state(vid, st)
+        # Acknowledge
+        await it.response.edit_message(embed=discord.Embed(title="Propriété acceptée", description=f"{target.mention} a accepté la propriété de \"{self.vc.name}\".", color=discord.Color.green()), view=None)
+
+    @discord.ui.button(label="Refuser", style=discord.ButtonStyle.danger)
+    async def refuse(self, it: discord.Interaction, b: discord.ui.Button):  # type: ignore[override]
+        st = self.st
+        st.pending = None
+        st.refuse_count += 1
+        st.last_proposal_ts = time.time()
+        st.last_target_id = self.target.id
+        # Cooldowns: 1 min after any refusal; 2h if >=3 refusals consécutifs
+        cd = 60.0
+        if st.refuse_count >= 3:
+            cd = 2 * 60 * 60
+            st.refuse_count = 0  # reset after long cooldown
+        st.cooldown_until = time.time() + cd
+        self.cog.save_transfer_state(self.voice_id, st)
+        await it.response.edit_message(embed=discord.Embed(title="Refusé", description=f"{self.target.mention} a refusé la propriété de \"{self.vc.name}\".", color=discord.Color.red()), view=None)
+
+    async def on_timeout(self) -> None:
+        try:
+            await self.message.edit(embed=discord.Embed(title="Transfert expiré", description="Aucune réponse.", color=discord.Color.orange()), view=None)  # type: ignore[union-attr]
+        except Exception:
+            pass
+        self.st.pending = None
+        self.st.cooldown_until = time.time() + 60  # small cooldown after expiry
+        self.cog.save_transfer_state(self.voice_id, self.st)
 
 
 class VoiceTemp(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        # Transfer anti-abuse and pending state per voice_id
-        # {voice_id: { 'pending': Optional[target_id], 'owner_id': int, 'last_proposal_ts': float,
-        #              'refuse_count': int, 'cooldown_until': float }}
-        self.transfer_state: Dict[int, Dict[str, int | float | None]] = {}
-        # Delayed deletion tasks for empty rooms: {voice_id: task}
-        self.deletion_tasks: Dict[int, asyncio.Task] = {}
+        # Transfer anti-abuse and pending state per voice_id, bounded and expiring
+        self.transfer_state: TTLStore[int, TransferState] = TTLStore(TRANSFER_STATE_MAX, TRANSFER_STATE_TTL)
+        # Pending deletions of empty rooms, keyed by voice_id (one task for all rooms)
+        self.deletions: DeadlineScheduler[int] = DeadlineScheduler(self._delete_rooms)
+        # Room creation is serialized per member {(guild_id, member_id)} and per hub {hub_id}
+        self._member_locks: KeyedLock[Tuple[int, int]] = KeyedLock()
+        self._hub_locks: KeyedLock[int] = KeyedLock()
+        # Last successful creation per (guild_id, member_id), perf_counter seconds
+        self._last_created: Dict[Tuple[int, int], float] = {}
+        # Room creations per guild, FIFO beyond the configured concurrency
+        self.admission: AdmissionQueue[int] = AdmissionQueue(config.voctemp_create_concurrency)
+        self.admission_wait_ms: Deque[float] = deque(maxlen=ADMISSION_WAIT_SAMPLES)
+        # Hub joins that did not create a room, per reason
+        self.suppressed_creations: Dict[str, int] = {reason: 0 for reason in SUPPRESSED_REASONS}
+        # Panel edits (rename / limit / lock) merged per voice channel, renames within Discord's budget
+        self.channel_edits = ChannelEditQueue()
+        # Control panel router: action -> (required permission flag, handler)
+        self.panel_routes: Dict[str, Tuple[int, Callable[[discord.Interaction, int], Awaitable[None]]]] = {
+            "kick": (PERM_KICK, functools.partial(self._panel_member_action, "kick")),
+            "mute": (PERM_MUTE, functools.partial(self._panel_member_action, "mute")),
+            "unmute": (PERM_MUTE, functools.partial(self._panel_member_action, "unmute")),
+            "rename": (PERM_RENAME, self._panel_rename),
+            "limit": (PERM_LIMIT, self._panel_limit),
+            "lock": (PERM_LOCK, self._panel_lock),
+            "transfer": (PERM_TRANSFER, self._panel_transfer),
+        }
+        # on_ready and on_resumed may overlap; one reconciliation pass at a time
+        self._reconcile_lock = asyncio.Lock()
+        # Active temp rooms, authoritative in-process copy of voctemp_rooms: {voice_id: Room}
+        # Loaded in cog_load, written through on create / transfer / delete.
+        self.rooms: Dict[int, Room] = {}
+        # Hub channels per guild: {guild_id: {hub_channel_id: (hub_id, target_category_id, perms_mask, panel_in_voice)}}
+        # Answers "is this a hub?" for every voice join without touching SQLite.
+        self.hubs: Dict[int, Dict[int, Tuple[int, Optional[int], int, bool]]] = {}
+        # Spare pools per hub_id and their background refill tasks
+        self.spare_pools: Dict[int, SparePool] = {}
+        self._refill_tasks: Dict[int, asyncio.Task] = {}
+        # Gateway voice_state_update counts per class (see classify_voice_event)
+        self.voice_event_counts: Dict[str, int] = {kind: 0 for kind in VOICE_EVENT_KINDS}
+        # Hub join -> member moved into the new room, in ms (most recent samples)
+        self.move_latencies_ms: Deque[float] = deque(maxlen=MOVE_LATENCY_SAMPLES)
 
     async def cog_load(self) -> None:
-        # Register persistent control view so buttons survive restarts
-        self.bot.add_view(self.ControlPersistentView(self))
+        await self._load_hubs()
+        await self._load_rooms()
+        await self._load_spares()
+        self.deletions.start()
+        # Panel buttons carry their voice id: one dynamic item class serves every panel, across restarts
+        self.bot.add_dynamic_items(PanelButton)
+
+    async def cog_unload(self) -> None:
+        # Refills create channels and write spares: stop them before the queues they feed
+        tasks = list(self._refill_tasks.values())
+        self._refill_tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.deletions.stop()
+        await self.channel_edits.stop()
+        self.bot.remove_dynamic_items(PanelButton)
+
+    async def _load_hubs(self) -> None:
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            async with conn.execute("SELECT id, guild_id, hub_channel_id, target_category_id, perms_mask, spare_pool_size, panel_in_voice FROM voctemp_hubs") as cur:
+                rows = await cur.fetchall()
+        self.hubs = {}
+        self.spare_pools = {}
+        for hub_id, guild_id, hub_channel_id, target_category_id, perms_mask, spare_pool_size, panel_in_voice in rows:
+            target = int(target_category_id) if target_category_id else None
+            self._index_hub(int(guild_id), int(hub_channel_id), int(hub_id), target, int(perms_mask), bool(panel_in_voice))
+            self.spare_pools[int(hub_id)] = SparePool(guild_id=int(guild_id), category_id=target, size=int(spare_pool_size))
+
+    def _index_hub(self, guild_id: int, hub_channel_id: int, hub_id: int, target_category_id: Optional[int], perms_mask: int, panel_in_voice: bool = False) -> None:
+        self.hubs.setdefault(guild_id, {})[hub_channel_id] = (hub_id, target_category_id, perms_mask, panel_in_voice)
+
+    async def _load_rooms(self) -> None:
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            async with conn.execute(
+                "SELECT r.id, r.guild_id, r.hub_id, r.owner_id, r.voice_channel_id, r.text_channel_id, r.control_message_id, r.active, COALESCE(h.perms_mask, 0) "
+                "FROM voctemp_rooms r LEFT JOIN voctemp_hubs h ON r.hub_id=h.id WHERE r.active=1"
+            ) as cur:
+                rows = await cur.fetchall()
+        self.rooms = {int(row[4]): Room(*row) for row in rows}
+
+    async def _load_spares(self) -> None:
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            async with conn.execute("SELECT voice_channel_id, hub_id FROM voctemp_spares ORDER BY created_at") as cur:
+                rows = await cur.fetchall()
+        orphans = []
+        for voice_id, hub_id in rows:
+            pool = self.spare_pools.get(int(hub_id))
+            if pool:
+                pool.channels.append(int(voice_id))
+            else:
+                orphans.append((int(voice_id),))
+        if orphans:
+            await self.bot.db.writes.write_many("DELETE FROM voctemp_spares WHERE voice_channel_id=?", orphans)  # type: ignore[attr-defined]
+
+    # ---------------- Spare pool ----------------
+    def set_spare_pool_size(self, hub_id: int, size: int) -> None:
+        pool = self.spare_pools.get(hub_id)
+        if pool is None:
+            return
+        pool.size = max(0, min(MAX_SPARE_POOL, size))
+        self._schedule_refill(hub_id)
+
+    def _schedule_refill(self, hub_id: int) -> None:
+        task = self._refill_tasks.get(hub_id)
+        if task and not task.done():
+            return
+        task = self._refill_tasks[hub_id] = asyncio.create_task(self._refill_pool(hub_id))
+        task.add_done_callback(lambda t: self._refill_done(hub_id, t))
+
+    def _refill_done(self, hub_id: int, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Remplissage de la réserve du hub {hub_id} interrompu", exc_info=task.exception())
+
+    async def _refill_pool(self, hub_id: int) -> None:
+        pool = self.spare_pools.get(hub_id)
+        guild = self.bot.get_guild(pool.guild_id) if pool else None
+        if not pool or not guild:
+            return
+        # Shrink first (size lowered from the manage menu)
+        while len(pool.channels) > pool.size:
+            voice_id = pool.channels.pop()
+            self.bot.db.writes.defer("DELETE FROM voctemp_spares WHERE voice_channel_id=?", (voice_id,))  # type: ignore[attr-defined]
+            ch = guild.get_channel(voice_id)
+            if isinstance(ch, discord.VoiceChannel):
+                try:
+                    await ch.delete(reason="Réserve voc temp réduite")
+                except Exception:
+                    pass
+        category = guild.get_channel(pool.category_id) if pool.category_id else None
+        if not isinstance(category, discord.CategoryChannel):
+            return
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            guild.me: discord.PermissionOverwrite(view_channel=True, connect=True, move_members=True),
+        }
+        while len(pool.channels) < pool.size:
+            try:
+                voice = await guild.create_voice_channel(SPARE_CHANNEL_NAME, category=category, overwrites=overwrites, reason="Réserve salon vocal temporaire")
+            except Exception as e:
+                logger.warning(f"Réserve du hub {hub_id} non remplie: {e}")
+                return
+            pool.channels.append(voice.id)
+            await self.bot.db.writes.write(  # type: ignore[attr-defined]
+                "INSERT OR REPLACE INTO voctemp_spares(voice_channel_id, guild_id, hub_id) VALUES(?,?,?)",
+                (voice.id, guild.id, hub_id),
+            )
+
+    async def _take_spare(self, guild: discord.Guild, hub_id: int, owner: discord.Member) -> Optional[discord.VoiceChannel]:
+        pool = self.spare_pools.get(hub_id)
+        if not pool or pool.size == 0:
+            return None
+        if not pool.channels:
+            # Nothing to hand out: don't queue on the lock behind other hand-outs
+            self._schedule_refill(hub_id)
+            return None
+        voice: Optional[discord.VoiceChannel] = None
+        # Hand-outs are FIFO per hub
+        async with self._hub_locks.acquire(hub_id):
+            while pool.channels and voice is None:
+                voice_id = pool.channels.popleft()
+                self.bot.db.writes.defer("DELETE FROM voctemp_spares WHERE voice_channel_id=?", (voice_id,))  # type: ignore[attr-defined]
+                ch = guild.get_channel(voice_id)
+                if not isinstance(ch, discord.VoiceChannel):
+                    continue
+                try:
+                    # Rename + unhide (category permissions) in a single edit
+                    await ch.edit(name=f"Salon de {owner.display_name}", sync_permissions=True, reason="Salon vocal temporaire (réserve)")
+                    self.channel_edits.record_rename(voice_id)
+                    voice = ch
+                except Exception as e:
+                    # Already dropped from the pool and the table: delete it rather than leave it hidden forever
+                    logger.warning(f"Salon de réserve {voice_id} inutilisable: {e}")
+                    try:
+                        await ch.delete(reason="Salon de réserve inutilisable")
+                    except Exception:
+                        pass
+        self._schedule_refill(hub_id)
+        return voice
+
+    async def _reconcile_spares(self) -> None:
+        # Drop spares whose channel vanished while offline, then top every pool up
+        gone = []
+        for hub_id, pool in self.spare_pools.items():
+            guild = self.bot.get_guild(pool.guild_id)
+            if not guild:
+                continue
+            for voice_id in list(pool.channels):
+                if not isinstance(guild.get_channel(voice_id), discord.VoiceChannel):
+                    pool.channels.remove(voice_id)
+                    gone.append((voice_id,))
+            self._schedule_refill(hub_id)
+        if gone:
+            await self.bot.db.writes.write_many("DELETE FROM voctemp_spares WHERE voice_channel_id=?", gone)  # type: ignore[attr-defined]
+
+    # ---------------- Reconciliation ----------------
+    async def _reconcile_rooms(self) -> None:
+        # Catch up on what happened while offline / disconnected: rooms whose voice
+        # channel vanished are closed, rooms left empty are scheduled for deletion.
+        async with self._reconcile_lock:
+            started = time.perf_counter()
+            async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+                async with conn.execute("SELECT id, guild_id, voice_channel_id, text_channel_id FROM voctemp_rooms WHERE active=1") as cur:
+                    rows = await cur.fetchall()
+            closed = []
+            orphans = []
+            scheduled = 0
+            for room_id, guild_id, voice_id, text_id in rows:
+                guild = self.bot.get_guild(int(guild_id))
+                if guild is None or guild.unavailable:
+                    # Not in cache (yet): don't close rooms we can't see
+                    continue
+                voice = guild.get_channel(int(voice_id))
+                if not isinstance(voice, discord.VoiceChannel):
+                    closed.append((int(room_id),))
+                    self._forget_room(int(voice_id))
+                    text = guild.get_channel(int(text_id)) if text_id else None
+                    if isinstance(text, discord.TextChannel):
+                        orphans.append(text)
+                elif not voice.members:
+                    if int(voice_id) not in self.deletions:
+                        self.deletions.schedule(int(voice_id), EMPTY_ROOM_TIMEOUT)
+                        scheduled += 1
+                else:
+                    self.deletions.cancel(int(voice_id))
+            if closed:
+                await self.bot.db.writes.write_many("UPDATE voctemp_rooms SET active=0 WHERE id=?", closed)  # type: ignore[attr-defined]
+            sem = asyncio.Semaphore(RECONCILE_CONCURRENCY)
+
+            async def delete_orphan(ch: discord.TextChannel) -> None:
+                async with sem:
+                    try:
+                        await ch.delete(reason="Salon vocal temp disparu (réconciliation)")
+                    except Exception:
+                        pass
+
+            await asyncio.gather(*(delete_orphan(ch) for ch in orphans))
+            logger.info(
+                f"Réconciliation voc temp: {len(rows)} salon(s) actif(s), {len(closed)} fermé(s), "
+                f"{len(orphans)} compagnon(s) orphelin(s) supprimé(s), {scheduled} suppression(s) planifiée(s) "
+                f"en {(time.perf_counter() - started) * 1000:.0f} ms"
+            )
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        await self._reconcile_rooms()
+        await self._reconcile_spares()
+
+    @commands.Cog.listener()
+    async def on_resumed(self) -> None:
+        await self._reconcile_rooms()
 
     # ---------------- Admin (prefix): +hube group ----------------
     @commands.group(name="hub", invoke_without_command=True, help="Gestion des hubs vocaux temporaires (admin)")
@@ -171,6 +823,11 @@ class VoiceTemp(commands.Cog):
     async def hub(self, ctx: commands.Context):
         await ctx.send(embed=success_embed("Hub", "Utilisez `+hub create` pour créer un hub ou `+hub manage {id}` pour modifier."))
 
+    @hub.command(name="stats", help="Statistiques internes des salons vocaux temporaires (admin)")
+    @is_admin()
+    async def hub_stats(self, ctx: commands.Context):
+        await ctx.send(embed=self.build_stats_embed())
+
     @hub.command(name="create", help="Créer un hub de salons vocaux temporaires (admin)")
     @is_admin()
     async def hub_create(self, ctx: commands.Context):
@@ -180,18 +837,17 @@ class VoiceTemp(commands.Cog):
     @hub.command(name="manage", help="Modifier un hub voc temp: +hub manage {id}")
     @is_admin()
     async def hub_manage(self, ctx: commands.Context, hub_id: int):
-        conn = await ensure_db()
-        async with conn.execute(
-            "SELECT id, guild_id, category_id, target_category_id, hub_channel_id, name, perms_mask FROM voctemp_hubs WHERE id=? AND guild_id=?",
-            (hub_id, ctx.guild.id),  # type: ignore[union-attr]
-        ) as cur:
-            row = await cur.fetchone()
-        await conn.close()
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            async with conn.execute(
+                "SELECT id, guild_id, category_id, target_category_id, hub_channel_id, name, perms_mask, spare_pool_size, panel_in_voice FROM voctemp_hubs WHERE id=? AND guild_id=?",
+                (hub_id, ctx.guild.id),  # type: ignore[union-attr]
+            ) as cur:
+                row = await cur.fetchone()
         if not row:
             await ctx.send(embed=error_embed("Hub introuvable"))
             return
-        _, guild_id, hub_cat, voice_cat, hub_channel_id, name, perms_mask = row
-        state = HubConfigState(guild_id=guild_id, hub_category_id=int(hub_cat) if hub_cat else None, voice_category_id=int(voice_cat) if voice_cat else None, name=name, perms_mask=int(perms_mask))
+        _, guild_id, hub_cat, voice_cat, hub_channel_id, name, perms_mask, spare_pool_size, panel_in_voice = row
+        state = HubConfigState(guild_id=guild_id, hub_category_id=int(hub_cat) if hub_cat else None, voice_category_id=int(voice_cat) if voice_cat else None, name=name, perms_mask=int(perms_mask), spare_pool_size=int(spare_pool_size), panel_in_voice=bool(panel_in_voice))
 
         # Build initial modify menu embed
         def build_modify_embed(s: HubConfigState) -> discord.Embed:
@@ -199,6 +855,8 @@ class VoiceTemp(commands.Cog):
             e.add_field(name="Nom actuel", value=s.name or "(non défini)")
             e.add_field(name="Catégorie hub", value=f"<#{s.hub_category_id}>" if s.hub_category_id else "(n/a)")
             e.add_field(name="Catégorie des salons", value=f"<#{s.voice_category_id}>" if s.voice_category_id else "(n/a)")
+            e.add_field(name="Salons de réserve", value=str(s.spare_pool_size))
+            e.add_field(name="Panneau de contrôle", value=panel_mode_label(s.panel_in_voice))
             lines = []
             for flag, label in ALL_FLAGS:
                 lines.append(f"- {label}: {'ON' if has_flag(s.perms_mask, flag) else 'OFF'}")
@@ -215,8 +873,35 @@ class VoiceTemp(commands.Cog):
                 self.state = s
                 self.add_item(self._btn_rename())
                 self.add_item(self._btn_perms())
+                self.add_item(self._btn_spares())
+                self.add_item(self._btn_panel_mode())
                 self.add_item(self._btn_close())
 
+            def _btn_spares(self) -> discord.ui.Button:
+                async def on_saved(inter: discord.Interaction):
+                    await self.outer.bot.db.writes.write("UPDATE voctemp_hubs SET spare_pool_size=? WHERE id=? AND guild_id=?", (self.state.spare_pool_size, self.hub_id, inter.guild.id if inter.guild else 0))  # type: ignore[attr-defined]
+                    self.outer.set_spare_pool_size(self.hub_id, self.state.spare_pool_size)
+                    await inter.response.edit_message(embed=build_modify_embed(self.state), view=ModifyMenu(self.outer, self.hub_id, self.hub_channel_id, self.state))
+                async def on_click(inter: discord.Interaction):
+                    await inter.response.send_modal(SparePoolModal(self.state, on_saved=on_saved))
+                b = discord.ui.Button(label="Salons de réserve", style=discord.ButtonStyle.secondary)
+                b.callback = on_click  # type: ignore[assignment]
+                return b
+
+            def _btn_panel_mode(self) -> discord.ui.Button:
+                async def on_click(inter: discord.Interaction):
+                    self.state.panel_in_voice = not self.state.panel_in_voice
+                    await self.outer.bot.db.writes.write("UPDATE voctemp_hubs SET panel_in_voice=? WHERE id=? AND guild_id=?", (int(self.state.panel_in_voice), self.hub_id, inter.guild.id if inter.guild else 0))  # type: ignore[attr-defined]
+                    # New rooms of this hub use the new mode; existing rooms keep their panel
+                    if inter.guild and self.hub_channel_id:
+                        indexed = self.outer.find_hub_by_channel(inter.guild.id, self.hub_channel_id)
+                        if indexed:
+                            self.outer._index_hub(inter.guild.id, self.hub_channel_id, indexed[0], indexed[1], indexed[2], self.state.panel_in_voice)
+                    await inter.response.edit_message(embed=build_modify_embed(self.state), view=ModifyMenu(self.outer, self.hub_id, self.hub_channel_id, self.state))
+                b = discord.ui.Button(label=f"Panneau: {panel_mode_label(not self.state.panel_in_voice)}", style=discord.ButtonStyle.secondary)
+                b.callback = on_click  # type: ignore[assignment]
+                return b
+
             def _btn_close(self) -> discord.ui.Button:
                 async def on_click(inter: discord.Interaction):
                     await inter.response.edit_message(view=None)
@@ -243,10 +928,7 @@ class VoiceTemp(commands.Cog):
                         except Exception:
                             pass
                         # Persist to DB
-                        conn2 = await ensure_db()
-                        await conn2.execute("UPDATE voctemp_hubs SET name=? WHERE id=? AND guild_id=?", (new_name, self.hub_id, inter.guild.id if inter.guild else 0))
-                        await conn2.commit()
-                        await conn2.close()
+                        self.outer.bot.db.writes.defer("UPDATE voctemp_hubs SET name=? WHERE id=? AND guild_id=?", (new_name, self.hub_id, inter.guild.id if inter.guild else 0))  # type: ignore[attr-defined]
                         self.state.name = new_name
                         # Rename actual hub voice channel if exists
                         if inter.guild and self.hub_channel_id:
@@ -295,10 +977,17 @@ class VoiceTemp(commands.Cog):
 
             def _confirm(self) -> discord.ui.Button:
                 async def on_click(inter: discord.Interaction):
-                    conn2 = await ensure_db()
-                    await conn2.execute("UPDATE voctemp_hubs SET perms_mask=? WHERE id=? AND guild_id=?", (self.state.perms_mask, self.hub_id, inter.guild.id if inter.guild else 0))
-                    await conn2.commit()
-                    await conn2.close()
+                    async with self.outer.bot.db.acquire() as conn2:  # type: ignore[attr-defined]
+                        await conn2.execute("UPDATE voctemp_hubs SET perms_mask=? WHERE id=? AND guild_id=?", (self.state.perms_mask, self.hub_id, inter.guild.id if inter.guild else 0))
+                        await conn2.commit()
+                    # Hub index and live rooms of this hub follow the new mask
+                    if inter.guild and self.hub_channel_id:
+                        indexed = self.outer.find_hub_by_channel(inter.guild.id, self.hub_channel_id)
+                        if indexed:
+                            self.outer._index_hub(inter.guild.id, self.hub_channel_id, indexed[0], indexed[1], self.state.perms_mask, indexed[3])
+                    for room in self.outer.rooms.values():
+                        if room.hub_id == self.hub_id:
+                            room.perms_mask = self.state.perms_mask
                     await inter.response.edit_message(embed=success_embed("Permissions mises à jour", "Les permissions du propriétaire ont été enregistrées."), view=ModifyMenu(self.outer, self.hub_id, self.hub_channel_id, self.state))
                 b = discord.ui.Button(label="Enregistrer", style=discord.ButtonStyle.success)
                 b.callback = on_click  # type: ignore[assignment]
@@ -325,6 +1014,7 @@ class VoiceTemp(commands.Cog):
         await self.hub_manage(ctx, hub_id)
 
     async def _run_hub_wizard(self, ctx: commands.Context, state: HubConfigState):
+        cog = self
         author_id = ctx.author.id
         channel = ctx.channel
         # Step 0: Name
@@ -441,7 +1131,24 @@ class VoiceTemp(commands.Cog):
             def __init__(self):
                 super().__init__(timeout=300)
                 self.add_item(self._back())
+                self.add_item(self._spares())
+                self.add_item(self._panel_mode())
                 self.add_item(self._confirm())
+            def _panel_mode(self) -> discord.ui.Button:
+                async def on_click(inter: discord.Interaction):
+                    state.panel_in_voice = not state.panel_in_voice
+                    await inter.response.edit_message(embed=build_recap_embed(), view=RecapView())
+                b = discord.ui.Button(label=f"Panneau: {panel_mode_label(not state.panel_in_voice)}", style=discord.ButtonStyle.secondary)
+                b.callback = on_click  # type: ignore[assignment]
+                return b
+            def _spares(self) -> discord.ui.Button:
+                async def on_saved(i: discord.Interaction):
+                    await i.response.edit_message(embed=build_recap_embed(), view=RecapView())
+                async def on_click(inter: discord.Interaction):
+                    await inter.response.send_modal(SparePoolModal(state, on_saved=on_saved))
+                b = discord.ui.Button(label="Salons de réserve", style=discord.ButtonStyle.secondary)
+                b.callback = on_click  # type: ignore[assignment]
+                return b
             def _back(self) -> discord.ui.Button:
                 async def on_click(inter: discord.Interaction):
                     await inter.response.edit_message(embed=build_perms_embed(state), view=PermsView())
@@ -463,43 +1170,95 @@ class VoiceTemp(commands.Cog):
                     except discord.Forbidden:
                         await inter.response.send_message("Permissions insuffisantes pour créer le salon.", ephemeral=True)
                         return
-                    conn2 = await ensure_db()
-                    await conn2.execute(
-                        "INSERT INTO voctemp_hubs(guild_id, category_id, target_category_id, hub_channel_id, name, perms_mask) VALUES(?,?,?,?,?,?)",
-                        (guild.id, state.hub_category_id, state.voice_category_id, hub.id, state.name, state.perms_mask),
-                    )
-                    await conn2.commit()
-                    await conn2.close()
+                    async with cog.bot.db.acquire() as conn2:  # type: ignore[attr-defined]
+                        cur = await conn2.execute(
+                            "INSERT INTO voctemp_hubs(guild_id, category_id, target_category_id, hub_channel_id, name, perms_mask, spare_pool_size, panel_in_voice) VALUES(?,?,?,?,?,?,?,?)",
+                            (guild.id, state.hub_category_id, state.voice_category_id, hub.id, state.name, state.perms_mask, state.spare_pool_size, int(state.panel_in_voice)),
+                        )
+                        await conn2.commit()
+                    new_hub_id = int(cur.lastrowid or 0)
+                    cog._index_hub(guild.id, hub.id, new_hub_id, state.voice_category_id, state.perms_mask, state.panel_in_voice)
+                    cog.spare_pools[new_hub_id] = SparePool(guild_id=guild.id, category_id=state.voice_category_id)
+                    cog.set_spare_pool_size(new_hub_id, state.spare_pool_size)
                     await inter.response.edit_message(embed=success_embed("Hub créé", f"{hub.mention}"), view=None)
                 b = discord.ui.Button(label="Confirmer", style=discord.ButtonStyle.success)
                 b.callback = on_click  # type: ignore[assignment]
                 return b
-        recap = build_config_embed(state)
-        recap.title = "Récapitulatif"
-        await msg.edit(embed=recap, view=RecapView())
+        def build_recap_embed() -> discord.Embed:
+            recap = build_config_embed(state)
+            recap.title = "Récapitulatif"
+            return recap
+        await msg.edit(embed=build_recap_embed(), view=RecapView())
 
     # ---------------- Helpers DB ----------------
-    async def get_perms_mask_for_voice(self, guild_id: int, voice_id: int) -> Optional[int]:
-        conn = await ensure_db()
-        async with conn.execute("SELECT h.perms_mask FROM voctemp_rooms r JOIN voctemp_hubs h ON r.hub_id=h.id WHERE r.guild_id=? AND r.voice_channel_id=? AND r.active=1", (guild_id, voice_id)) as cur:
-            row = await cur.fetchone()
-        await conn.close()
-        return int(row[0]) if row else None
-    async def find_hub_by_channel(self, guild_id: int, channel_id: int) -> Optional[Tuple[int, int, int]]:
-        conn = await ensure_db()
-        async with conn.execute("SELECT id, target_category_id, perms_mask FROM voctemp_hubs WHERE guild_id=? AND hub_channel_id=?", (guild_id, channel_id)) as cur:
-            row = await cur.fetchone()
-        await conn.close()
-        if not row:
-            return None
-        return int(row[0]), int(row[1]), int(row[2])
+    def get_room(self, guild_id: int, voice_id: int) -> Optional[Room]:
+        room = self.rooms.get(voice_id)
+        return room if room and room.guild_id == guild_id else None
+
+    def rooms_owned_by(self, guild_id: int, owner_id: int) -> List[Room]:
+        return [r for r in self.rooms.values() if r.owner_id == owner_id and r.guild_id == guild_id]
+
+    def get_perms_mask_for_voice(self, guild_id: int, voice_id: int) -> Optional[int]:
+        room = self.get_room(guild_id, voice_id)
+        return room.perms_mask if room else None
+
+    def find_hub_by_channel(self, guild_id: int, channel_id: int) -> Optional[Tuple[int, Optional[int], int, bool]]:
+        guild_hubs = self.hubs.get(guild_id)
+        return guild_hubs.get(channel_id) if guild_hubs else None
 
-    async def create_room(self, guild: discord.Guild, hub_id: int, category_id: int, owner: discord.Member, base_name: str, perms_mask: int) -> Optional[Room]:
+    async def create_room(self, guild: discord.Guild, hub_id: int, category_id: int, owner: discord.Member, base_name: str, perms_mask: int, started_at: Optional[float] = None, panel_in_voice: bool = False) -> Optional[Room]:
         category = guild.get_channel(category_id)
         if not isinstance(category, discord.CategoryChannel):
             return None
-        # Créer salon vocal
-        voice = await guild.create_voice_channel(f"Salon de {owner.display_name}", category=category, reason="Salon vocal temporaire")
+        started_at = started_at if started_at is not None else time.perf_counter()
+        # Salon de la réserve si disponible, sinon créer salon vocal
+        # (creates run in parallel, bounded by the admission queue in _join_hub)
+        voice = await self._take_spare(guild, hub_id, owner)
+        if voice is None:
+            voice = await guild.create_voice_channel(f"Salon de {owner.display_name}", category=category, reason="Salon vocal temporaire")
+        # Registered right away so a quick leave still schedules the deletion; filled in below
+        room = Room(id=0, guild_id=guild.id, hub_id=hub_id, owner_id=owner.id, voice_channel_id=voice.id, text_channel_id=None, control_message_id=None, active=1, perms_mask=perms_mask)
+        self.rooms[voice.id] = room
+        # Le membre est déplacé pendant que le salon compagnon et le panneau se créent
+        # (panel_in_voice: panneau dans le chat du salon vocal, pas de salon compagnon)
+        moved, companion = await asyncio.gather(
+            self._move_owner(owner, voice, started_at),
+            self._post_voice_panel(owner, perms_mask, voice) if panel_in_voice else self._create_companion(guild, category, owner, perms_mask, voice),
+            return_exceptions=True,
+        )
+        if moved is not True:
+            if isinstance(moved, BaseException):
+                logger.warning(f"Déplacement de {owner.id} vers {voice.id} échoué: {moved!r}")
+            # Nobody will join then leave it, so the leave handler would never schedule its deletion
+            if len(voice.members) == 0 and voice.id not in self.deletions:
+                self.deletions.schedule(voice.id, EMPTY_ROOM_TIMEOUT)
+        if isinstance(companion, BaseException):
+            # The room still works without its panel; keep it but say why it has none
+            logger.warning(f"Compagnon / panneau du salon {voice.id} non créé: {companion!r}")
+            companion = (None, None)
+        text, panel = companion
+        room.text_channel_id = text.id if text else None
+        room.control_message_id = panel.id if panel else None
+        async with self.bot.db.acquire() as conn:  # type: ignore[attr-defined]
+            cur = await conn.execute(
+                "INSERT INTO voctemp_rooms(guild_id, hub_id, owner_id, voice_channel_id, text_channel_id, control_message_id, active) VALUES(?,?,?,?,?,?,1)",
+                (guild.id, hub_id, room.owner_id, voice.id, room.text_channel_id, room.control_message_id),
+            )
+            room.id = int(cur.lastrowid or 0)
+            await conn.commit()
+        return room
+
+    async def _move_owner(self, owner: discord.Member, voice: discord.VoiceChannel, started_at: float) -> bool:
+        # Déplacer le membre (False si impossible, e.g. il a quitté le vocal entre-temps)
+        try:
+            await owner.move_to(voice, reason="Création salon vocal temporaire")
+        except Exception as e:
+            logger.info(f"Déplacement de {owner.id} vers {voice.id} impossible: {e}")
+            return False
+        self.move_latencies_ms.append((time.perf_counter() - started_at) * 1000)
+        return True
+
+    async def _create_companion(self, guild: discord.Guild, category: discord.CategoryChannel, owner: discord.Member, perms_mask: int, voice: discord.VoiceChannel) -> Tuple[discord.TextChannel, Optional[discord.Message]]:
         # Créer salon texte compagnon
         overwrites = {
             guild.default_role: discord.PermissionOverwrite(view_channel=False, send_messages=False),
@@ -512,48 +1271,108 @@ class VoiceTemp(commands.Cog):
             reason="Compagnon salon vocal temp (panneau visible seulement par le propriétaire)",
         )
         # Envoyer panneau
-        panel = await text.send(content=owner.mention, embed=self.build_control_embed(owner, perms_mask, voice), view=self.ControlPersistentView(self, owner_id=owner.id, perms_mask=perms_mask, voice_id=voice.id), allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False))
-        conn = await ensure_db()
-        await conn.execute(
-            "INSERT INTO voctemp_rooms(guild_id, hub_id, owner_id, voice_channel_id, text_channel_id, control_message_id, active) VALUES(?,?,?,?,?,?,1)",
-            (guild.id, hub_id, owner.id, voice.id, text.id, panel.id),
-        )
-        await conn.commit()
-        await conn.close()
-        # Déplacer le membre
         try:
-            await owner.move_to(voice, reason="Création salon vocal temporaire")
+            panel = await text.send(content=owner.mention, embed=self.build_control_embed(owner, perms_mask, voice), view=self.build_control_view(voice.id), allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False))
+        except Exception as e:
+            # The channel exists either way: returned so the room owns it and deletes it with the room
+            logger.warning(f"Panneau du salon {voice.id} non envoyé: {e}")
+            return text, None
+        return text, panel
+
+    async def _post_voice_panel(self, owner: discord.Member, perms_mask: int, voice: discord.VoiceChannel) -> Tuple[None, discord.Message]:
+        # Envoyer panneau dans le chat textuel du salon vocal
+        panel = await voice.send(content=owner.mention, embed=self.build_control_embed(owner, perms_mask, voice), view=self.build_control_view(voice.id), allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False))
+        return None, panel
+
+    async def _delete_rooms(self, voice_ids: List[int]) -> None:
+        self.transfer_state.sweep()
+        await asyncio.gather(*(self._delete_room(voice_id) for voice_id in voice_ids), return_exceptions=True)
+
+    async def _delete_room(self, voice_id: int) -> None:
+        room = self.rooms.get(voice_id)
+        guild = self.bot.get_guild(room.guild_id) if room else None
+        if not room or not guild:
+            return
+        voice = guild.get_channel(voice_id)
+        # If channel has members again, abort
+        if isinstance(voice, discord.VoiceChannel) and len(voice.members) > 0:
+            return
+        # Delete channels if still present/empty
+        try:
+            if room.text_channel_id:
+                ch = guild.get_channel(int(room.text_channel_id))
+                if isinstance(ch, discord.TextChannel):
+                    await ch.delete(reason="Salon vocal temp vide (timeout)")
+            if isinstance(voice, discord.VoiceChannel):
+                await voice.delete(reason="Salon vocal temp vide (timeout)")
         except Exception:
             pass
-        return Room(id=0, guild_id=guild.id, hub_id=hub_id, owner_id=owner.id, voice_channel_id=voice.id, text_channel_id=text.id, control_message_id=panel.id, active=1)
-
-    async def _delayed_delete_room(self, guild: discord.Guild, voice_id: int, text_channel_id: Optional[int], room_id: int):
+        # Mark inactive in DB
+        self._forget_room(voice_id)
+        self.bot.db.writes.defer("UPDATE voctemp_rooms SET active=0 WHERE id=?", (room.id,))  # type: ignore[attr-defined]
+
+    def save_transfer_state(self, voice_id: int, st: TransferState) -> None:
+        # Kept at least until its cooldown is over
+        self.transfer_state.set(voice_id, st, ttl=max(TRANSFER_STATE_TTL, st.cooldown_until - time.time()))
+
+    def _forget_room(self, voice_id: int) -> None:
+        # Drop every piece of in-memory state tied to a room once it is gone
+        self.rooms.pop(voice_id, None)
+        self.deletions.cancel(voice_id)
+        self.channel_edits.forget(voice_id)
+        self.transfer_state.pop(voice_id, None)
+
+    async def _send_edit(self, inter: discord.Interaction, vc: discord.VoiceChannel, done_msg: str, fail_msg: str, **changes) -> None:
+        # Answer within the interaction deadline whatever the edit queue does
+        fut = self.channel_edits.submit(vc, **changes)
+        # Only a rename waits on the budget; other fields go out now even if an earlier rename is held back
+        wait = self.channel_edits.delay_for(vc.id) if "name" in changes else 0.0
+        if wait:
+            await inter.response.send_message(
+                f"Modification en file d'attente (Discord limite les renommages à 2 par 10 min) : appliquée dans {humanize_delta(timedelta(seconds=int(wait) + 1))}.",
+                ephemeral=True,
+            )
+            return
         try:
-            await asyncio.sleep(60)
-            voice = guild.get_channel(voice_id)
-            # If channel was removed already or has members again, abort
-            if isinstance(voice, discord.VoiceChannel) and len(voice.members) > 0:
-                return
-            # Delete channels if still present/empty
-            try:
-                if text_channel_id:
-                    ch = guild.get_channel(int(text_channel_id))
-                    if isinstance(ch, discord.TextChannel):
-                        await ch.delete(reason="Salon vocal temp vide (timeout)")
-                if isinstance(voice, discord.VoiceChannel):
-                    await voice.delete(reason="Salon vocal temp vide (timeout)")
-            except Exception:
-                pass
-            # Mark inactive in DB
-            conn = await ensure_db()
-            await conn.execute("UPDATE voctemp_rooms SET active=0 WHERE id=?", (room_id,))
-            await conn.commit()
-            await conn.close()
-        finally:
-            # Clear task entry
-            t = self.deletion_tasks.get(voice_id)
-            if t and t.done():
-                self.deletion_tasks.pop(voice_id, None)
+            await asyncio.wait_for(asyncio.shield(fut), timeout=EDIT_REPLY_TIMEOUT)
+            msg = done_msg
+        except asyncio.TimeoutError:
+            msg = "Modification en file d'attente, elle sera appliquée sous peu."
+        except Exception:
+            msg = fail_msg
+        await inter.response.send_message(msg, ephemeral=True)
+
+    def build_stats_embed(self) -> discord.Embed:
+        e = discord.Embed(title="Salons vocaux temporaires — statistiques", color=discord.Color.blurple())
+        e.add_field(name="Salons actifs", value=str(len(self.rooms)))
+        e.add_field(name="Hubs", value=str(sum(len(h) for h in self.hubs.values())))
+        ready = sum(len(p.channels) for p in self.spare_pools.values())
+        target = sum(p.size for p in self.spare_pools.values())
+        e.add_field(name="Salons de réserve", value=f"{ready}/{target}")
+        e.add_field(name="Suppressions en attente", value=str(len(self.deletions)))
+        e.add_field(name="Modifications de salon", value=f"{self.channel_edits.applied} appliquée(s) / {self.channel_edits.submitted} demandée(s), {len(self.channel_edits)} en attente")
+        e.add_field(name="États de transfert", value=f"{len(self.transfer_state)} (expirés {self.transfer_state.expirations}, évincés {self.transfer_state.evictions})")
+        e.add_field(name="Vues enregistrées", value=str(stored_view_count(self.bot)))
+        waits = list(self.admission_wait_ms)
+        e.add_field(
+            name="File de création",
+            value=f"{self.admission.waiting()} en attente, {self.admission.queued}/{self.admission.admitted} mis en file"
+            + (f"\nattente p50 {percentile(waits, 0.5):.0f} ms | p99 {percentile(waits, 0.99):.0f} ms" if waits else ""),
+        )
+        e.add_field(name="Créations évitées", value=" | ".join(f"{reason}: {self.suppressed_creations[reason]}" for reason in SUPPRESSED_REASONS))
+        total = sum(self.voice_event_counts.values())
+        relevant = total - self.voice_event_counts[VOICE_EVENT_STATE]
+        lines = [f"- {kind}: {self.voice_event_counts[kind]}" for kind in VOICE_EVENT_KINDS]
+        lines.append(f"Pertinents: {relevant}/{total}")
+        e.add_field(name="Événements vocaux", value="\n".join(lines), inline=False)
+        lat = list(self.move_latencies_ms)
+        e.add_field(
+            name="Hub → déplacé (ms)",
+            value=f"p50 {percentile(lat, 0.5):.0f} | p90 {percentile(lat, 0.9):.0f} | p99 {percentile(lat, 0.99):.0f} (n={len(lat)})" if lat else "(aucune mesure)",
+            inline=False,
+        )
+        e.set_footer(text="Gentle Bernard")
+        return e
 
     def build_control_embed(self, owner: discord.Member, perms_mask: int, voice: discord.VoiceChannel) -> discord.Embed:
         lines = []
@@ -567,567 +1386,206 @@ class VoiceTemp(commands.Cog):
         e.set_footer(text="Gentle Bernard")
         return e
 
-    class ControlPersistentView(discord.ui.View):
-        def __init__(self, outer: 'VoiceTemp', owner_id: Optional[int] = None, perms_mask: Optional[int] = None, voice_id: Optional[int] = None):
-            super().__init__(timeout=None)
-            self.outer = outer
-            self.owner_id = owner_id
-            self.perms_mask = perms_mask
-            self.voice_id = voice_id
-            # When instantiated without specific ids (during startup), buttons still exist to capture custom_ids
-            # Buttons will parse voice_id from custom_id
-
-        def _set_lock_button_style(self, guild: Optional[discord.Guild], voice_id: int) -> None:
-            try:
-                if not guild:
-                    return
-                vc = guild.get_channel(voice_id)
-                if not isinstance(vc, discord.VoiceChannel):
-                    return
-                everyone = guild.default_role
-                ow = vc.overwrites_for(everyone)
-                locked = ow.connect is False
-                # Find lock button and set style: green if locked, gray if unlocked
-                for c in self.children:
-                    if isinstance(c, discord.ui.Button) and c.custom_id and c.custom_id.startswith("voctemp:lock:"):
-                        c.style = discord.ButtonStyle.success if locked else discord.ButtonStyle.secondary
-                        break
-            except Exception:
-                pass
-
-        async def _ensure_owner(self, inter: discord.Interaction, voice_id: int) -> Optional[discord.Member]:
-            if not inter.guild:
-                await inter.response.send_message("Contexte invalide.", ephemeral=True)
-                return None
-            member = inter.guild.get_member(inter.user.id)
-            if not member:
-                await inter.response.send_message("Membre introuvable.", ephemeral=True)
-                return None
-            conn = await ensure_db()
-            async with conn.execute("SELECT owner_id FROM voctemp_rooms WHERE guild_id=? AND voice_channel_id=? AND active=1", (inter.guild.id, voice_id)) as cur:
-                row = await cur.fetchone()
-            await conn.close()
-            if not row or int(row[0]) != member.id:
-                await inter.response.send_message("Seul le propriétaire peut utiliser ce panneau.", ephemeral=True)
-                return None
-            # Require the owner to be currently connected in the target voice channel
-            if not member.voice or not member.voice.channel or member.voice.channel.id != voice_id:
-                await inter.response.send_message("Vous devez être dans votre salon vocal pour utiliser ce panneau.", ephemeral=True)
-                return None
-            return member
-
-        class _ConfirmActionView(discord.ui.View):
-            def __init__(self, outer_view: 'VoiceTemp.ControlPersistentView', action: str, voice_id: int, target_id: int):
-                super().__init__(timeout=60)
-                self.outer_view = outer_view
-                self.action = action
-                self.voice_id = voice_id
-                self.target_id = target_id
-                self.add_item(self._btn_confirm())
-                self.add_item(self._btn_cancel())
-
-            def _btn_confirm(self) -> discord.ui.Button:
-                async def on_click(inter: discord.Interaction):
-                    if not inter.guild:
-                        await inter.response.send_message("Contexte invalide.", ephemeral=True)
-                        return
-                    owner = await self.outer_view._ensure_owner(inter, self.voice_id)
-                    if not owner:
-                        return
-                    member = inter.guild.get_member(self.target_id)
-                    vc = inter.guild.get_channel(self.voice_id)
-                    if not member or not isinstance(vc, discord.VoiceChannel) or member not in vc.members:
-                        await inter.response.edit_message(content="Le membre n'est pas dans votre salon.", view=None)
-                        return
-                    try:
-                        if self.action == 'kick':
-                            await member.move_to(None, reason="Expulsion du salon vocal temp")
-                        elif self.action == 'mute':
-                            await member.edit(mute=True, reason="Mute salon vocal temp")
-                        elif self.action == 'unmute':
-                            await member.edit(mute=False, reason="Unmute salon vocal temp")
-                        await inter.response.edit_message(content=f"Action {self.action} effectuée pour {member.mention}.", view=None)
-                    except Exception:
-                        await inter.response.edit_message(content="Action impossible.", view=None)
-                b = discord.ui.Button(label="Confirmer", style=discord.ButtonStyle.danger if self.action == 'kick' else discord.ButtonStyle.success)
-                b.callback = on_click  # type: ignore[assignment]
-                return b
-
-            def _btn_cancel(self) -> discord.ui.Button:
-                async def on_click(inter: discord.Interaction):
-                    await inter.response.edit_message(content="Action annulée.", view=None)
-                b = discord.ui.Button(label="Annuler", style=discord.ButtonStyle.secondary)
-                b.callback = on_click  # type: ignore[assignment]
-                return b
-
-        def _voice_id_from_message(self, inter: discord.Interaction) -> int:
-            try:
-                msg = inter.message
-                if not msg or not msg.embeds:
-                    return 0
-                emb = msg.embeds[0]
-                for f in emb.fields:
-                    if f.name.lower() == "salon vocal":
-                        # value like <#123456789>
-                        digits = "".join(ch for ch in f.value if ch.isdigit())
-                        return int(digits) if digits else 0
-            except Exception:
-                return 0
-            return 0
+    # ---------------- Control panel ----------------
+    def build_control_view(self, voice_id: int, locked: bool = False) -> discord.ui.View:
+        view = discord.ui.View(timeout=None)
+        for action in PANEL_BUTTONS:
+            view.add_item(PanelButton(action, voice_id, locked=locked))
+        # Clicks are dispatched by the PanelButton template, so the view itself has nothing to
+        # listen for. Sent unfinished, the view store would keep an entry per panel message
+        # forever (stop() cannot evict a fully dynamic view); finished views are never stored.
+        view.stop()
+        return view
 
-        def _get_ids(self, custom_id: str, inter: Optional[discord.Interaction] = None) -> Tuple[str, int]:
-            parts = custom_id.split(":")
-            action = parts[1] if len(parts) > 1 else ""
-            vid = int(parts[2]) if len(parts) > 2 and parts[2].isdigit() else (self.voice_id or 0)
-            if vid == 0 and inter is not None:
-                vid = self._voice_id_from_message(inter)
-            return action, vid
-
-        @discord.ui.button(label="Renommer", style=discord.ButtonStyle.primary, custom_id="voctemp:rename:0", row=1)
-        async def btn_rename(self, inter: discord.Interaction, btn: discord.ui.Button):  # type: ignore[override]
-            action, vid = self._get_ids(inter.data.get('custom_id', ''), inter)  # type: ignore[attr-defined]
-            if action != 'rename' or vid == 0:
-                await inter.response.send_message("Panneau non initialisé.", ephemeral=True)
-                return
-            # Enforce mask
-            mask = await self.outer.get_perms_mask_for_voice(inter.guild.id, vid) if inter.guild else None
-            if mask is None or not has_flag(mask, PERM_RENAME):
-                await inter.response.send_message("Action non autorisée.", ephemeral=True)
-                return
-            class RenameModal(discord.ui.Modal, title="Renommer le salon"):
-                def __init__(self):
-                    super().__init__()
-                    self.name = discord.ui.TextInput(label="Nouveau nom", max_length=90)
-                    self.add_item(self.name)
-                async def on_submit(self, i: discord.Interaction):
-                    owner = await self_outer._ensure_owner(i, vid)
-                    if not owner or not i.guild:
-                        return
-                    vc = i.guild.get_channel(vid)
-                    if isinstance(vc, discord.VoiceChannel):
-                        try:
-                            await vc.edit(name=str(self.name.value)[:90])
-                            await i.response.send_message("Nom mis à jour.", ephemeral=True)
-                        except Exception:
-                            await i.response.send_message("Impossible de renommer.", ephemeral=True)
-            self_outer = self
-            await inter.response.send_modal(RenameModal())
-
-        @discord.ui.button(label="Limiter", style=discord.ButtonStyle.secondary, custom_id="voctemp:limit:0", row=1)
-        async def btn_limit(self, inter: discord.Interaction, btn: discord.ui.Button):  # type: ignore[override]
-            action, vid = self._get_ids(inter.data.get('custom_id', ''), inter)  # type: ignore[attr-defined]
-            if action != 'limit' or vid == 0:
-                await inter.response.send_message("Panneau non initialisé.", ephemeral=True)
-                return
-            mask = await self.outer.get_perms_mask_for_voice(inter.guild.id, vid) if inter.guild else None
-            if mask is None or not has_flag(mask, PERM_LIMIT):
-                await inter.response.send_message("Action non autorisée.", ephemeral=True)
-                return
-            class LimitModal(discord.ui.Modal, title="Limiter le salon"):
-                def __init__(self):
-                    super().__init__()
-                    self.val = discord.ui.TextInput(label="Limite (0 pour illimité)", max_length=3)
-                    self.add_item(self.val)
-                async def on_submit(self, i: discord.Interaction):
-                    owner = await self_outer._ensure_owner(i, vid)
-                    if not owner or not i.guild:
-                        return
-                    try:
-                        limit = max(0, min(99, int(str(self.val.value))))
-                    except Exception:
-                        await i.response.send_message("Valeur invalide.", ephemeral=True)
-                        return
-                    vc = i.guild.get_channel(vid)
-                    if isinstance(vc, discord.VoiceChannel):
-                        try:
-                            await vc.edit(user_limit=limit)
-                            await i.response.send_message("Limite mise à jour.", ephemeral=True)
-                        except Exception:
-                            await i.response.send_message("Impossible de mettre à jour la limite.", ephemeral=True)
-            self_outer = self
-            await inter.response.send_modal(LimitModal())
-
-        @discord.ui.button(label="Lock/Unlock", style=discord.ButtonStyle.secondary, custom_id="voctemp:lock:0", row=1)
-        async def btn_lock(self, inter: discord.Interaction, btn: discord.ui.Button):  # type: ignore[override]
-            action, vid = self._get_ids(inter.data.get('custom_id', ''), inter)  # type: ignore[attr-defined]
-            if action != 'lock' or vid == 0:
-                await inter.response.send_message("Panneau non initialisé (lock).", ephemeral=True)
-                return
-            mask = await self.outer.get_perms_mask_for_voice(inter.guild.id, vid) if inter.guild else None
-            if mask is None or not has_flag(mask, PERM_LOCK):
-                await inter.response.send_message("Action non autorisée (verrou).", ephemeral=True)
-                return
-            owner = await self._ensure_owner(inter, vid)
-            if not owner or not inter.guild:
-                return
-            vc = inter.guild.get_channel(vid)
-            if not isinstance(vc, discord.VoiceChannel):
-                await inter.response.send_message("Salon introuvable (lock).", ephemeral=True)
-                return
-            everyone = inter.guild.default_role
-            ow = vc.overwrites_for(everyone)
-            locked = ow.connect is False
-            ow.connect = None if locked else False
-            try:
-                await vc.set_permissions(everyone, overwrite=ow)
-                # Refresh lock button style based on new state
-                self._set_lock_button_style(inter.guild, vid)
-                await inter.response.send_message("Salon verrouillé" if not locked else "Salon déverrouillé", ephemeral=True)
-                # Try to refresh the panel view (if we have a message context)
-                try:
-                    await inter.message.edit(view=self)
-                except Exception:
-                    pass
-            except Exception:
-                await inter.response.send_message("Action impossible (lock).", ephemeral=True)
+    async def _ensure_owner(self, inter: discord.Interaction, voice_id: int) -> Optional[discord.Member]:
+        if not inter.guild:
+            await inter.response.send_message("Contexte invalide.", ephemeral=True)
+            return None
+        member = inter.guild.get_member(inter.user.id)
+        if not member:
+            await inter.response.send_message("Membre introuvable.", ephemeral=True)
+            return None
+        room = self.get_room(inter.guild.id, voice_id)
+        if not room or room.owner_id != member.id:
+            await inter.response.send_message("Seul le propriétaire peut utiliser ce panneau.", ephemeral=True)
+            return None
+        # Require the owner to be currently connected in the target voice channel
+        if not member.voice or not member.voice.channel or member.voice.channel.id != voice_id:
+            await inter.response.send_message("Vous devez être dans votre salon vocal pour utiliser ce panneau.", ephemeral=True)
+            return None
+        return member
 
-        @discord.ui.button(label="Passer la propriété", style=discord.ButtonStyle.success, custom_id="voctemp:transfer:0", row=2)
-        async def btn_transfer(self, inter: discord.Interaction, btn: discord.ui.Button):  # type: ignore[override]
-            action, vid = self._get_ids(inter.data.get('custom_id', ''), inter)  # type: ignore[attr-defined]
-            if action != 'transfer' or vid == 0:
-                await inter.response.send_message("Panneau non initialisé.", ephemeral=True)
-                return
-            mask = await self.outer.get_perms_mask_for_voice(inter.guild.id, vid) if inter.guild else None
-            if mask is None or not has_flag(mask, PERM_TRANSFER):
-                await inter.response.send_message("Action non autorisée.", ephemeral=True)
-                return
-            owner = await self._ensure_owner(inter, vid)
-            if not owner or not inter.guild:
-                return
-            vc = inter.guild.get_channel(vid)
-            if not isinstance(vc, discord.VoiceChannel):
-                await inter.response.send_message("Salon introuvable.", ephemeral=True)
-                return
-            # Anti abuse: cooldowns
-            st = self.outer.transfer_state.get(vid) or {'pending': None, 'owner_id': owner.id, 'last_proposal_ts': 0.0, 'refuse_count': 0, 'cooldown_until': 0.0}
-            now = time.time()
-            if now < float(st.get('cooldown_until', 0.0)):
-                await inter.response.send_message("Transfert en cooldown. Réessayez plus tard.", ephemeral=True)
-                return
-            if st.get('pending'):
-                await inter.response.send_message("Une proposition est déjà en attente.", ephemeral=True)
-                return
-            # Ask owner to select target
-            class _SelectTransferTarget(discord.ui.View):
-                def __init__(self, parent_view: 'VoiceTemp.ControlPersistentView', voice_id: int):
-                    super().__init__(timeout=60)
-                    self.parent_view = parent_view
-                    self.voice_id = voice_id
-                    self.add_item(self._make_select())
-                def _make_select(self) -> discord.ui.UserSelect:
-                    select = discord.ui.UserSelect(min_values=1, max_values=1)
-                    async def on_select(i: discord.Interaction):
-                        user = select.values[0]
-                        if not i.guild:
-                            await i.response.send_message("Contexte invalide.", ephemeral=True)
-                            return
-                        target = i.guild.get_member(user.id)
-                        if not target or target.id == owner.id or target not in vc.members:
-                            await i.response.send_message("Cible invalide.", ephemeral=True)
-                            return
-                        # 30s between different proposals
-                        if now - float(st.get('last_proposal_ts', 0.0)) < 30 and st.get('last_target_id') != target.id:
-                            await i.response.send_message("Attendez 30 secondes avant une nouvelle proposition à une autre personne.", ephemeral=True)
-                            return
-                        # Create proposal message in the fixed transfer channel pinging target
-                        ch = i.guild.get_channel(TRANSFER_CHANNEL_ID)
-                        if not isinstance(ch, discord.TextChannel):
-                            await i.response.send_message("Salon de transfert introuvable.", ephemeral=True)
-                            return
-                        embed = discord.Embed(title="Proposition de transfert de propriété", description=f"{target.mention}\n{owner.mention} souhaite vous transférer la propriété du salon \"{vc.name}\".", color=discord.Color.blurple())
-                        embed.set_footer(text="Expire dans 60 secondes")
-                        # Build accept/refuse view only for target
-                        class _AcceptRefuse(discord.ui.View):
-                            def __init__(self):
-                                super().__init__(timeout=60)
-                                self.message = None
-                            async def interaction_check(self, it: discord.Interaction) -> bool:
-                                return it.user.id == target.id
-                            @discord.ui.button(label="Accepter", style=discord.ButtonStyle.success)
-                            async def accept(self, it: discord.Interaction, b: discord.ui.Button):  # type: ignore[override]
-                                # Update DB owner
-                                conn = await ensure_db()
-                                await conn.execute("UPDATE voctemp_rooms SET owner_id=? WHERE guild_id=? AND voice_channel_id=? AND active=1", (target.id, it.guild.id, vid))
-                                await conn.commit()
-                                await conn.close()
-                                # Update panel visibility: remove old owner, add new owner
-                                try:
-                                    await ch.set_permissions(owner, view_channel=False)
-                                    await ch.set_permissions(target, view_channel=True, send_messages=False)
-                                except Exception:
-                                    pass
-                                # Clear state
-                                st['pending'] = None
-                                st['refuse_count'] = 0
-                                st['last_proposal_ts'] = time.time()
-                                st['last_target_id'] = target.id
-                                self.parent_view.outer.transfer_state[vid] = st  # type: ignore[index]
-                                # Acknowledge
-                                await it.response.edit_message(embed=discord.Embed(title="Propriété acceptée", description=f"{target.mention} a accepté la propriété de \"{vc.name}\".", color=discord.Color.green()), view=None)
-                            @discord.ui.button(label="Refuser", style=discord.ButtonStyle.danger)
-                            async def refuse(self, it: discord.Interaction, b: discord.ui.Button):  # type: ignore[override]
-                                st['pending'] = None
-                                st['refuse_count'] = int(st.get('refuse_count', 0)) + 1
-                                st['last_proposal_ts'] = time.time()
-                                st['last_target_id'] = target.id
-                                # Cooldowns: 1 min after any refusal; 2h if >=3 refusals consécutifs
-                                cd = 60.0
-                                if int(st['refuse_count']) >= 3:
-                                    cd = 2 * 60 * 60
-                                    st['refuse_count'] = 0  # reset after long cooldown
-                                st['cooldown_until'] = time.time() + cd
-                                self.parent_view.outer.transfer_state[vid] = st  # type: ignore[index]
-                                await it.response.edit_message(embed=discord.Embed(title="Refusé", description=f"{target.mention} a refusé la propriété de \"{vc.name}\".", color=discord.Color.red()), view=None)
-                            async def on_timeout(self) -> None:
-                                try:
-                                    await self.message.edit(embed=discord.Embed(title="Transfert expiré", description="Aucune réponse.", color=discord.Color.orange()), view=None)
-                                except Exception:
-                                    pass
-                                st['pending'] = None
-                                st['cooldown_until'] = time.time() + 60  # small cooldown after expiry
-                                self.parent_view.outer.transfer_state[vid] = st  # type: ignore[index]
-                        view = _AcceptRefuse()
-                        msg = await ch.send(content=target.mention, embed=embed, view=view, allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False))
-                        view.message = msg  # type: ignore[attr-defined]
-                        # Mark pending
-                        st['pending'] = target.id
-                        st['owner_id'] = owner.id
-                        st['last_proposal_ts'] = now
-                        st['last_target_id'] = target.id
-                        self.parent_view.outer.transfer_state[vid] = st  # type: ignore[index]
-                        await i.response.send_message("Proposition envoyée.", ephemeral=True)
-                    select.callback = on_select  # type: ignore[assignment]
-                    return select
-            await inter.response.send_message(view=_SelectTransferTarget(self, vid), ephemeral=True, content="Choisissez un membre à qui proposer la propriété")
-
-        # ----- Actions sur membres: Kick / Mute / Unmute -----
-        class _SelectMemberView(discord.ui.View):
-            def __init__(self, outer_view: 'VoiceTemp.ControlPersistentView', action: str, voice_id: int):
-                super().__init__(timeout=60)
-                self.outer_view = outer_view
-                self.action = action
-                self.voice_id = voice_id
-                self.add_item(self._make_select())
-
-            def _make_select(self) -> discord.ui.UserSelect:
-                select = discord.ui.UserSelect(min_values=1, max_values=1)
-                async def on_select(inter: discord.Interaction):
-                    user = select.values[0]
-                    if not inter.guild:
-                        await inter.response.send_message("Contexte invalide.", ephemeral=True)
-                        return
-                    member = inter.guild.get_member(user.id)
-                    owner = await self.outer_view._ensure_owner(inter, self.voice_id)
-                    if not owner:
-                        return
-                    vc = inter.guild.get_channel(self.voice_id)
-                    if not isinstance(vc, discord.VoiceChannel) or member not in vc.members:
-                        await inter.response.send_message("Le membre n'est pas dans votre salon", ephemeral=True)
-                        return
-                    # Show ephemeral confirmation view
-                    await inter.response.send_message(
-                        content=f"Confirmer l'action {self.action} sur {member.mention} ?",
-                        view=self.outer_view._ConfirmActionView(self.outer_view, self.action, self.voice_id, member.id),
-                        ephemeral=True,
-                    )
-                select.callback = on_select  # type: ignore[assignment]
-                return select
-
-        @discord.ui.button(label="Expulser", style=discord.ButtonStyle.danger, custom_id="voctemp:kick:0", row=0)
-        async def btn_kick(self, inter: discord.Interaction, btn: discord.ui.Button):  # type: ignore[override]
-            action, vid = self._get_ids(inter.data.get('custom_id', ''), inter)  # type: ignore[attr-defined]
-            if action != 'kick' or vid == 0:
-                await inter.response.send_message("Panneau non initialisé (kick).", ephemeral=True)
-                return
-            mask = await self.outer.get_perms_mask_for_voice(inter.guild.id, vid) if inter.guild else None
-            if mask is None or not has_flag(mask, PERM_KICK):
-                await inter.response.send_message("Action non autorisée (kick).", ephemeral=True)
-                return
-            await inter.response.send_message(view=_SelectMemberView(self, 'kick', vid), ephemeral=True, content="Choisissez un membre à expulser")
+    async def route_panel_action(self, inter: discord.Interaction, action: str, voice_id: int) -> None:
+        route = self.panel_routes.get(action)
+        if route is None or voice_id == 0:
+            await inter.response.send_message("Panneau non initialisé.", ephemeral=True)
+            return
+        flag, handler = route
+        # Enforce mask
+        mask = self.get_perms_mask_for_voice(inter.guild.id, voice_id) if inter.guild else None
+        if mask is None or not has_flag(mask, flag):
+            await inter.response.send_message("Action non autorisée.", ephemeral=True)
+            return
+        await handler(inter, voice_id)
 
-        @discord.ui.button(label="Mute", style=discord.ButtonStyle.secondary, custom_id="voctemp:mute:0", row=0)
-        async def btn_mute(self, inter: discord.Interaction, btn: discord.ui.Button):  # type: ignore[override]
-            action, vid = self._get_ids(inter.data.get('custom_id', ''), inter)  # type: ignore[attr-defined]
-            if action != 'mute' or vid == 0:
-                await inter.response.send_message("Panneau non initialisé (mute).", ephemeral=True)
-                return
-            mask = await self.outer.get_perms_mask_for_voice(inter.guild.id, vid) if inter.guild else None
-            if mask is None or not has_flag(mask, PERM_MUTE):
-                await inter.response.send_message("Action non autorisée (mute).", ephemeral=True)
-                return
-            await inter.response.send_message(view=_SelectMemberView(self, 'mute', vid), ephemeral=True, content="Choisissez un membre à mute")
+    async def _panel_rename(self, inter: discord.Interaction, voice_id: int) -> None:
+        await inter.response.send_modal(RenameModal(self, voice_id))
 
-        @discord.ui.button(label="Unmute", style=discord.ButtonStyle.secondary, custom_id="voctemp:unmute:0", row=0)
-        async def btn_unmute(self, inter: discord.Interaction, btn: discord.ui.Button):  # type: ignore[override]
-            action, vid = self._get_ids(inter.data.get('custom_id', ''), inter)  # type: ignore[attr-defined]
-            if action != 'unmute' or vid == 0:
-                await inter.response.send_message("Panneau non initialisé (unmute).", ephemeral=True)
-                return
-            mask = await self.outer.get_perms_mask_for_voice(inter.guild.id, vid) if inter.guild else None
-            if mask is None or not has_flag(mask, PERM_MUTE):
-                await inter.response.send_message("Action non autorisée (unmute).", ephemeral=True)
-                return
-            await inter.response.send_message(view=_SelectMemberView(self, 'unmute', vid), ephemeral=True, content="Choisissez un membre à unmute")
+    async def _panel_limit(self, inter: discord.Interaction, voice_id: int) -> None:
+        await inter.response.send_modal(LimitModal(self, voice_id))
 
-    def build_control_view(self, owner_id: int, perms_mask: int, voice_id: int) -> discord.ui.View:
-        # Backward compat if needed elsewhere, but we'll primarily use ControlPersistentView
-        return self.ControlPersistentView(self, owner_id=owner_id, perms_mask=perms_mask, voice_id=voice_id)
+    async def _panel_lock(self, inter: discord.Interaction, voice_id: int) -> None:
+        owner = await self._ensure_owner(inter, voice_id)
+        if not owner or not inter.guild:
+            return
+        vc = inter.guild.get_channel(voice_id)
+        if not isinstance(vc, discord.VoiceChannel):
+            await inter.response.send_message("Salon introuvable (lock).", ephemeral=True)
+            return
+        # Toggle from the queued state if a lock/unlock is still pending
+        locked = self.channel_edits.pending(voice_id).get("locked", vc.overwrites_for(inter.guild.default_role).connect is False)
+        await self._send_edit(inter, vc, "Salon verrouillé" if not locked else "Salon déverrouillé", "Action impossible (lock).", locked=not locked)
+        # Refresh lock button style based on new state
+        try:
+            await inter.message.edit(view=self.build_control_view(voice_id, locked=not locked))  # type: ignore[union-attr]
+        except Exception:
+            pass
 
-        async def ensure_owner(inter: discord.Interaction) -> Optional[discord.Member]:
-            if not inter.guild:
-                await inter.response.send_message("Contexte invalide.", ephemeral=True)
-                return None
-            member = inter.guild.get_member(inter.user.id)
-            if not member:
-                await inter.response.send_message("Membre introuvable.", ephemeral=True)
-                return None
-            # Vérifier propriétaire
-            conn = await ensure_db()
-            async with conn.execute("SELECT owner_id FROM voctemp_rooms WHERE guild_id=? AND voice_channel_id=? AND active=1", (inter.guild.id, voice_id)) as cur:
-                row = await cur.fetchone()
-            await conn.close()
-            if not row or int(row[0]) != member.id:
-                await inter.response.send_message("Seul le propriétaire peut utiliser ce panneau.", ephemeral=True)
-                return None
-            return member
-
-        # RENAME
-        if has_flag(perms_mask, PERM_RENAME):
-            class RenameModal(discord.ui.Modal, title="Renommer le salon"):
-                def __init__(self):
-                    super().__init__()
-                    self.name = discord.ui.TextInput(label="Nouveau nom", max_length=90)
-                    self.add_item(self.name)
-                async def on_submit(self, inter: discord.Interaction):
-                    member = await ensure_owner(inter)
-                    if not member or not inter.guild:
-                        return
-                    voice = inter.guild.get_channel(voice_id)
-                    if isinstance(voice, discord.VoiceChannel):
-                        try:
-                            await voice.edit(name=str(self.name.value)[:90])
-                            await inter.response.send_message("Nom mis à jour.", ephemeral=True)
-                        except Exception:
-                            await inter.response.send_message("Impossible de renommer.", ephemeral=True)
-            async def on_rename(inter: discord.Interaction):
-                await inter.response.send_modal(RenameModal())
-            btn = discord.ui.Button(label="Renommer", style=discord.ButtonStyle.primary, custom_id=f"voctemp:rename:{voice_id}")
-            btn.callback = on_rename  # type: ignore[assignment]
-            view.add_item(btn)
-
-        # LIMIT
-        if has_flag(perms_mask, PERM_LIMIT):
-            class LimitModal(discord.ui.Modal, title="Limiter le salon"):
-                def __init__(self):
-                    super().__init__()
-                    self.val = discord.ui.TextInput(label="Limite (0 pour illimité)", max_length=3)
-                    self.add_item(self.val)
-                async def on_submit(self, inter: discord.Interaction):
-                    member = await ensure_owner(inter)
-                    if not member or not inter.guild:
-                        return
-                    try:
-                        limit = max(0, min(99, int(str(self.val.value))))
-                    except Exception:
-                        await inter.response.send_message("Valeur invalide.", ephemeral=True)
-                        return
-                    voice = inter.guild.get_channel(voice_id)
-                    if isinstance(voice, discord.VoiceChannel):
-                        try:
-                            await voice.edit(user_limit=limit)
-                            await inter.response.send_message("Limite mise à jour.", ephemeral=True)
-                        except Exception:
-                            await inter.response.send_message("Impossible de mettre à jour la limite.", ephemeral=True)
-            async def on_limit(inter: discord.Interaction):
-                await inter.response.send_modal(LimitModal())
-            btn = discord.ui.Button(label="Limiter", style=discord.ButtonStyle.secondary, custom_id=f"voctemp:limit:{voice_id}")
-            btn.callback = on_limit  # type: ignore[assignment]
-            view.add_item(btn)
-
-        # LOCK/UNLOCK
-        if has_flag(perms_mask, PERM_LOCK):
-            async def on_lock_toggle(inter: discord.Interaction):
-                member = await ensure_owner(inter)
-                if not member or not inter.guild:
-                    return
-                voice = inter.guild.get_channel(voice_id)
-                if not isinstance(voice, discord.VoiceChannel):
-                    await inter.response.send_message("Salon introuvable.", ephemeral=True)
-                    return
-                everyone = inter.guild.default_role
-                ow = voice.overwrites_for(everyone)
-                locked = ow.connect is False
-                ow.connect = None if locked else False
-                try:
-                    await voice.set_permissions(everyone, overwrite=ow)
-                    await inter.response.send_message("Salon verrouillé" if not locked else "Salon déverrouillé", ephemeral=True)
-                except Exception:
-                    await inter.response.send_message("Action impossible.", ephemeral=True)
-            btn = discord.ui.Button(label="Lock/Unlock", style=discord.ButtonStyle.secondary, custom_id=f"voctemp:lock:{voice_id}")
-            btn.callback = on_lock_toggle  # type: ignore[assignment]
-            view.add_item(btn)
-
-        # TRANSFER
-        if has_flag(perms_mask, PERM_TRANSFER):
-            async def on_transfer(inter: discord.Interaction):
-                member = await ensure_owner(inter)
-                if not member or not inter.guild:
-                    return
-                voice = inter.guild.get_channel(voice_id)
-                if not isinstance(voice, discord.VoiceChannel):
-                    await inter.response.send_message("Salon introuvable.", ephemeral=True)
-                    return
-                # Simple transfert au dernier membre (hors owner) si présent
-                candidates = [m for m in voice.members if m.id != member.id]
-                if not candidates:
-                    await inter.response.send_message("Aucun candidat dans le salon.", ephemeral=True)
-                    return
-                new_owner = candidates[0]
-                conn = await ensure_db()
-                await conn.execute("UPDATE voctemp_rooms SET owner_id=? WHERE guild_id=? AND voice_channel_id=? AND active=1", (new_owner.id, inter.guild.id, voice_id))
-                await conn.commit()
-                await conn.close()
-                await inter.response.send_message(f"Propriété transférée à {new_owner.mention}", ephemeral=True)
-            btn = discord.ui.Button(label="Passer la propriété", style=discord.ButtonStyle.success, custom_id=f"voctemp:transfer:{voice_id}")
-            btn.callback = on_transfer  # type: ignore[assignment]
-            view.add_item(btn)
+    async def _panel_transfer(self, inter: discord.Interaction, voice_id: int) -> None:
+        owner = await self._ensure_owner(inter, voice_id)
+        if not owner or not inter.guild:
+            return
+        vc = inter.guild.get_channel(voice_id)
+        if not isinstance(vc, discord.VoiceChannel):
+            await inter.response.send_message("Salon introuvable.", ephemeral=True)
+            return
+        # Anti abuse: cooldowns
+        st = self.transfer_state.get(voice_id) or TransferState(owner_id=owner.id)
+        now = time.time()
+        if now < st.cooldown_until:
+            await inter.response.send_message("Transfert en cooldown. Réessayez plus tard.", ephemeral=True)
+            return
+        if st.pending:
+            await inter.response.send_message("Une proposition est déjà en attente.", ephemeral=True)
+            return
+        # Ask owner to select target
+        await inter.response.send_message(view=TransferTargetView(self, voice_id, owner, vc, st, now), ephemeral=True, content="Choisissez un membre à qui proposer la propriété")
 
-        return view
+    async def _panel_member_action(self, action: str, inter: discord.Interaction, voice_id: int) -> None:
+        labels = {"kick": "expulser", "mute": "mute", "unmute": "unmute"}
+        await inter.response.send_message(view=SelectMemberView(self, action, voice_id), ephemeral=True, content=f"Choisissez un membre à {labels[action]}")
 
     # ---------------- Voice events ----------------
     @commands.Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        received_at = time.perf_counter()
+        kind = classify_voice_event(before, after)
+        self.voice_event_counts[kind] += 1
+        if kind == VOICE_EVENT_STATE:
+            # mute / deafen / stream / video toggles: nothing to do
+            return
+        if kind == VOICE_EVENT_JOIN:
+            await self._on_voice_join(member, after.channel, received_at)  # type: ignore[arg-type]
+        elif kind == VOICE_EVENT_LEAVE:
+            await self._on_voice_leave(member, before.channel)  # type: ignore[arg-type]
+        else:
+            # Leave first so a room left for a hub is still scheduled for deletion
+            await self._on_voice_leave(member, before.channel)  # type: ignore[arg-type]
+            await self._on_voice_join(member, after.channel, received_at)  # type: ignore[arg-type]
+
+    async def _on_voice_join(self, member: discord.Member, channel: discord.abc.GuildChannel, received_at: float) -> None:
+        if not isinstance(channel, discord.VoiceChannel):
+            return
         # Création: si rejoint un hub
-        if after and after.channel and isinstance(after.channel, discord.VoiceChannel):
-            hub = await self.find_hub_by_channel(member.guild.id, after.channel.id)
-            if hub:
-                hub_id, category_id, perms_mask = hub
-                # Créer room
-                await self.create_room(member.guild, hub_id, category_id, member, after.channel.name, perms_mask)
+        hub = self.find_hub_by_channel(member.guild.id, channel.id)
+        if hub:
+            await self._join_hub(member, channel, hub, received_at)
+            return
+        # If joined a temp room, cancel any pending deletion for that room
+        if self.get_room(member.guild.id, channel.id):
+            self.deletions.cancel(channel.id)
+
+    async def _join_hub(self, member: discord.Member, hub_channel: discord.VoiceChannel, hub: Tuple[int, Optional[int], int, bool], received_at: float) -> None:
+        hub_id, category_id, perms_mask, panel_in_voice = hub
+        key = (member.guild.id, member.id)
+        async with self._member_locks.acquire(key):
+            # Queued behind an earlier join that already moved the member out of the hub
+            if not member.voice or not member.voice.channel or member.voice.channel.id != hub_channel.id:
+                self.suppressed_creations["duplicate"] += 1
                 return
-            # If joined a temp room, cancel any pending deletion for that room
-            connj = await ensure_db()
-            async with connj.execute("SELECT id FROM voctemp_rooms WHERE guild_id=? AND voice_channel_id=? AND active=1", (member.guild.id, after.channel.id)) as cur:
-                jrow = await cur.fetchone()
-            await connj.close()
-            if jrow and after.channel.id in self.deletion_tasks:
-                task = self.deletion_tasks.pop(after.channel.id, None)
-                if task and not task.done():
-                    task.cancel()
-        # Suppression: si quitte un salon temporaire et qu'il devient vide
-        if before and before.channel and isinstance(before.channel, discord.VoiceChannel):
-            voice = before.channel
-            # Est-ce un salon temp ?
-            conn = await ensure_db()
-            async with conn.execute("SELECT id, text_channel_id FROM voctemp_rooms WHERE guild_id=? AND voice_channel_id=? AND active=1", (member.guild.id, voice.id)) as cur:
-                row = await cur.fetchone()
-            if row and len(voice.members) == 0:
-                room_id, text_id = row
-                # Schedule deletion in 60s if not already scheduled
-                if voice.id not in self.deletion_tasks or self.deletion_tasks[voice.id].done():
-                    self.deletion_tasks[voice.id] = asyncio.create_task(self._delayed_delete_room(member.guild, voice.id, int(text_id) if text_id else None, int(room_id)))
-            await conn.close()
+            owned = self.rooms_owned_by(member.guild.id, member.id)
+            last = self._last_created.get(key)
+            reason = None
+            if owned and last is not None and received_at - last < CREATE_DEBOUNCE:
+                reason = "debounce"
+            elif len(owned) >= MAX_ROOMS_PER_OWNER:
+                reason = "cap"
+            if reason:
+                self.suppressed_creations[reason] += 1
+                # Renvoyer le membre dans son dernier salon plutôt que le laisser dans le hub
+                voice = member.guild.get_channel(owned[-1].voice_channel_id)
+                if isinstance(voice, discord.VoiceChannel):
+                    try:
+                        await member.move_to(voice, reason="Salon vocal temporaire existant")
+                    except Exception:
+                        pass
+                return
+            # Créer room, au plus N créations simultanées par serveur (file FIFO)
+            notice = None
+            admitted = asyncio.Event()
+            if self.admission.would_wait(member.guild.id):
+                notice = asyncio.create_task(self._send_wait_notice(member, hub_channel, self.admission.waiting(member.guild.id) + 1, admitted))
+            queued_at = time.perf_counter()
+            async with self.admission.admit(member.guild.id):
+                admitted.set()
+                self.admission_wait_ms.append((time.perf_counter() - queued_at) * 1000)
+                if notice and (not member.voice or not member.voice.channel or member.voice.channel.id != hub_channel.id):
+                    # Left the hub while waiting
+                    room = None
+                    self.suppressed_creations["abandoned"] += 1
+                else:
+                    room = await self.create_room(member.guild, hub_id, category_id, member, hub_channel.name, perms_mask, started_at=received_at, panel_in_voice=panel_in_voice)
+            if notice:
+                asyncio.create_task(self._clear_wait_notice(notice))
+            if room:
+                if len(self._last_created) > 1024:
+                    now = time.perf_counter()
+                    self._last_created = {k: t for k, t in self._last_created.items() if now - t < CREATE_DEBOUNCE}
+                self._last_created[key] = time.perf_counter()
+
+    async def _send_wait_notice(self, member: discord.Member, hub_channel: discord.VoiceChannel, position: int, admitted: asyncio.Event) -> Optional[discord.Message]:
+        # Posted in the hub's voice chat, only when the member is still queued after WAIT_NOTICE_DELAY
+        try:
+            await asyncio.wait_for(admitted.wait(), timeout=WAIT_NOTICE_DELAY)
+            return None
+        except asyncio.TimeoutError:
+            pass
+        try:
+            return await hub_channel.send(
+                f"{member.mention} ton salon est en préparation (position {position} dans la file)…",
+                allowed_mentions=discord.AllowedMentions(users=True, roles=False, everyone=False),
+                delete_after=120,
+            )
+        except Exception:
+            return None
+
+    async def _clear_wait_notice(self, notice: asyncio.Task) -> None:
+        try:
+            msg = await notice
+            if msg:
+                await msg.delete()
+        except Exception:
+            pass
 
+    async def _on_voice_leave(self, member: discord.Member, channel: discord.abc.GuildChannel) -> None:
+        # Suppression: si quitte un salon temporaire et qu'il devient vide
+        if not isinstance(channel, discord.VoiceChannel):
+            return
+        room = self.get_room(member.guild.id, channel.id)
+        if room and len(channel.members) == 0:
+            # Schedule deletion in 60s if not already scheduled
+            if channel.id not in self.deletions:
+                self.deletions.schedule(channel.id, EMPTY_ROOM_TIMEOUT)
 
 
 async def setup(bot: commands.Bot) -> None:
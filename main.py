@@ -9,6 +9,7 @@ import discord
 from discord.ext import commands
 
 from utils.config import config
+from utils.db import Database
 from utils.logging_setup import setup_logging
 from utils.keep_alive import start_keep_alive, stop_keep_alive
 
@@ -27,8 +28,12 @@ class CIGamingBot(commands.Bot):
 
         super().__init__(command_prefix=config.prefix, intents=intents, help_command=None)
         self.logger = setup_logging(logging.INFO)
+        # Shared database service, opened (and migrated) once in setup_hook
+        self.db = Database(counter_block_size=config.counter_block_size)
 
     async def setup_hook(self) -> None:
+        await self.db.connect()
+
         # Dynamically load all cogs from the cogs directory
         if COGS_FOLDER.exists():
             for file in COGS_FOLDER.glob("*.py"):
@@ -54,6 +59,12 @@ class CIGamingBot(commands.Bot):
         except Exception as e:
             self.logger.error(f"Erreur de synchronisation des commandes: {e}")
 
+    async def close(self) -> None:
+        try:
+            await super().close()
+        finally:
+            await self.db.close()
+
     async def on_ready(self) -> None:
         self.logger.info(f"Connecté en tant que {self.user} (ID: {self.user.id})")
         await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="Une grenouille presque verte"))
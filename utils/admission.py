@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Generic, Optional
+
+from utils.common import K
+
+
+class AdmissionQueue(Generic[K]):
+    """At most `concurrency` holders per key, later arrivals wait in FIFO order."""
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = max(1, concurrency)
+        self._active: Dict[K, int] = {}
+        self._waiters: Dict[K, Deque[asyncio.Future]] = {}
+        # Metrics
+        self.admitted = 0
+        self.queued = 0
+
+    def waiting(self, key: Optional[K] = None) -> int:
+        if key is None:
+            return sum(len(q) for q in self._waiters.values())
+        return len(self._waiters.get(key, ()))
+
+    def would_wait(self, key: K) -> bool:
+        return self._active.get(key, 0) >= self.concurrency or bool(self._waiters.get(key))
+
+    @asynccontextmanager
+    async def admit(self, key: K) -> AsyncIterator[None]:
+        if self.would_wait(key):
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(key, deque()).append(fut)
+            self.queued += 1
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    # Slot was handed over just before the cancel: pass it on
+                    self._release(key)
+                else:
+                    q = self._waiters.get(key)
+                    if q is not None:
+                        if fut in q:
+                            q.remove(fut)
+                        if not q:
+                            del self._waiters[key]
+                raise
+        else:
+            self._active[key] = self._active.get(key, 0) + 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._release(key)
+
+    def _release(self, key: K) -> None:
+        q = self._waiters.get(key)
+        while q:
+            fut = q.popleft()
+            if not q:
+                del self._waiters[key]
+            if not fut.done():
+                # The slot changes hands, the active count stays the same
+                fut.set_result(None)
+                return
+        self._active[key] -= 1
+        if self._active[key] == 0:
+            del self._active[key]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Set, Tuple
+
+import discord
+
+logger = logging.getLogger("cigaming_bot.channel_edits")
+
+# Discord allows 2 renames of a channel per 10 minutes; a third one stalls the route with a 429
+RENAME_LIMIT = 2
+RENAME_WINDOW = 600.0
+
+
+class ChannelEditQueue:
+    """Coalesces edits per voice channel and applies them in one edit() call."""
+
+    def __init__(self, rename_limit: int = RENAME_LIMIT, rename_window: float = RENAME_WINDOW) -> None:
+        self.rename_limit = rename_limit
+        self.rename_window = rename_window
+        self._channels: Dict[int, discord.VoiceChannel] = {}
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._waiters: Dict[int, List[Tuple[Set[str], asyncio.Future]]] = {}
+        self._renames: Dict[int, Deque[float]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        # Set by submit() so a worker waiting out the rename budget sends the other fields now
+        self._wakeups: Dict[int, asyncio.Event] = {}
+        # Metrics
+        self.submitted = 0
+        self.applied = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pending(self, channel_id: int) -> Dict[str, Any]:
+        return dict(self._pending.get(channel_id, {}))
+
+    def delay_for(self, channel_id: int) -> float:
+        # Seconds before the pending rename of this channel can be sent (0 if none / now)
+        if "name" not in self._pending.get(channel_id, {}):
+            return 0.0
+        return self._rename_wait(channel_id)
+
+    def _rename_wait(self, channel_id: int) -> float:
+        stamps = self._renames.get(channel_id)
+        if not stamps or len(stamps) < self.rename_limit:
+            return 0.0
+        return max(0.0, stamps[0] + self.rename_window - time.monotonic())
+
+    def record_rename(self, channel_id: int) -> None:
+        # A rename sent outside the queue still spends the channel's budget
+        self._renames.setdefault(channel_id, deque(maxlen=self.rename_limit)).append(time.monotonic())
+
+    def submit(self, channel: discord.VoiceChannel, **changes: Any) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        # Callers may stop waiting before the edit goes out: never leave an exception unretrieved
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._channels[channel.id] = channel
+        self._pending.setdefault(channel.id, {}).update(changes)
+        self._waiters.setdefault(channel.id, []).append((set(changes), fut))
+        self.submitted += 1
+        self._wakeups.setdefault(channel.id, asyncio.Event()).set()
+        task = self._tasks.get(channel.id)
+        if task is None or task.done():
+            self._tasks[channel.id] = asyncio.create_task(self._run(channel.id))
+        return fut
+
+    def forget(self, channel_id: int) -> None:
+        # Channel deleted: drop its queue and rename history
+        task = self._tasks.pop(channel_id, None)
+        if task and not task.done():
+            task.cancel()
+        self._renames.pop(channel_id, None)
+        self._drop(channel_id)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for channel_id in list(self._pending):
+            self._drop(channel_id)
+        self._tasks.clear()
+
+    def _drop(self, channel_id: int) -> None:
+        self._pending.pop(channel_id, None)
+        self._channels.pop(channel_id, None)
+        self._wakeups.pop(channel_id, None)
+        for _, fut in self._waiters.pop(channel_id, []):
+            if not fut.done():
+                fut.cancel()
+
+    async def _run(self, channel_id: int) -> None:
+        while self._pending.get(channel_id):
+            pending = self._pending[channel_id]
+            wait = self._rename_wait(channel_id) if "name" in pending else 0.0
+            batch = {k: v for k, v in pending.items() if k != "name" or wait == 0}
+            if not batch:
+                # Only the rename is held back: wait for its budget or for a new submit()
+                wakeup = self._wakeups.setdefault(channel_id, asyncio.Event())
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for k in batch:
+                del pending[k]
+            try:
+                await self._apply(self._channels[channel_id], batch)
+            except Exception as e:
+                logger.warning(f"Modification du salon {channel_id} échouée ({e}): {sorted(batch)}")
+                self._settle(channel_id, set(batch), e)
+            else:
+                if "name" in batch:
+                    self.record_rename(channel_id)
+                self.applied += 1
+                self._settle(channel_id, set(batch), None)
+        self._pending.pop(channel_id, None)
+        self._channels.pop(channel_id, None)
+        self._wakeups.pop(channel_id, None)
+        self._tasks.pop(channel_id, None)
+
+    def _settle(self, channel_id: int, keys: Set[str], error: BaseException | None) -> None:
+        remaining = []
+        for fields, fut in self._waiters.get(channel_id, []):
+            if fut.done():
+                continue
+            if error is not None and fields & keys:
+                fut.set_exception(error)
+                continue
+            fields -= keys
+            if fields:
+                remaining.append((fields, fut))
+            else:
+                fut.set_result(None)
+        self._waiters[channel_id] = remaining
+        if not remaining:
+            self._waiters.pop(channel_id, None)
+
+    @staticmethod
+    async def _apply(channel: discord.VoiceChannel, batch: Dict[str, Any]) -> None:
+        kwargs = dict(batch)
+        locked = kwargs.pop("locked", None)
+        if locked is not None:
+            everyone = channel.guild.default_role
+            ow = channel.overwrites_for(everyone)
+            ow.connect = False if locked else None
+            overwrites = dict(channel.overwrites)
+            overwrites[everyone] = ow
+            kwargs["overwrites"] = overwrites
+        await channel.edit(**kwargs, reason="Panneau salon vocal temporaire")
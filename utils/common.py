@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Hashable, Optional, TypeVar
+
+# Key of the per-key structures in utils (locks, admission, caches, scheduler)
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BackgroundWorker(ABC):
+    """Owns one long-running _run() task: start() launches it, stop() cancels it and waits for it."""
+
+    _task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def _run(self) -> None: ...
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -46,6 +46,18 @@ class Config:
         cl = (os.getenv("CONFESSION_LOGS_ID") or os.getenv("CONFESSION_SALON_ID") or "").strip()
         self.confession_logs_id: Optional[int] = int(cl) if cl.isdigit() else None
 
+        # Counter block reservation: numbers reserved per database write (1 = no reservation)
+        cb = (os.getenv("COUNTER_BLOCK_SIZE") or "").strip()
+        self.counter_block_size: int = max(1, int(cb)) if cb.isdigit() else 1
+
+        # Confessions kept in memory by message id (button clicks and modal submits)
+        cc = (os.getenv("CONFESSION_CACHE_SIZE") or "").strip()
+        self.confession_cache_size: int = max(1, int(cc)) if cc.isdigit() else 1024
+
+        # Temp voice rooms created at once per guild; later hub joins wait in a FIFO queue
+        vc = (os.getenv("VOCTEMP_CREATE_CONCURRENCY") or "").strip()
+        self.voctemp_create_concurrency: int = max(1, int(vc)) if vc.isdigit() else 3
+
         # Optional owner id
         owner = (os.getenv("BOT_OWNER_ID") or os.getenv("OWNER_ID") or "").strip()
         self.owner_id: Optional[int] = int(owner) if owner.isdigit() else None
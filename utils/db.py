@@ -1,31 +1,120 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import sqlite3
+import sys
 import aiosqlite
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.common import BackgroundWorker
 
 _DB_PATH = Path(__file__).resolve().parent.parent / "data" / "bot.db"
 
+# Write-behind group commit: flush after this many statements or this many seconds
+WRITE_BEHIND_MAX_BATCH = 64
+WRITE_BEHIND_MAX_DELAY = 0.05
+
+logger = logging.getLogger("cigaming_bot.db")
+
 
-async def ensure_db() -> aiosqlite.Connection:
-    _DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = await aiosqlite.connect(_DB_PATH.as_posix())
+async def _open(path: Path) -> aiosqlite.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = await aiosqlite.connect(path.as_posix())
     await conn.execute("PRAGMA journal_mode=WAL;")
-    await migrate(conn)
     return conn
 
 
-async def migrate(conn: aiosqlite.Connection) -> None:
-    await conn.executescript(
+class Database:
+    """Long-lived SQLite connection shared by the whole bot."""
+
+    def __init__(self, path: Path = _DB_PATH, counter_block_size: int = 1) -> None:
+        self.path = path
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        self.counters = CounterAllocator(self, counter_block_size)
+        self.writes = WriteBehindQueue(self)
+
+    async def connect(self) -> None:
+        if self._conn is not None:
+            return
+        conn = await _open(self.path)
+        try:
+            await migrate(conn)
+        except Exception:
+            await conn.close()
+            raise
+        self._conn = conn
+        self.writes.start()
+
+    async def close(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            await self.writes.stop()
+            await self.counters.release()
+        finally:
+            conn, self._conn = self._conn, None
+            async with self._lock:
+                await conn.close()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        if self._conn is None:
+            raise RuntimeError("Base de données non connectée")
+        async with self._lock:
+            conn = self._conn
+            try:
+                yield conn
+            except BaseException:
+                # Never leave a half-done transaction for the next borrower to commit
+                if conn.in_transaction:
+                    await conn.rollback()
+                raise
+
+
+MigrationFn = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+# Ordered registry: (version, description, step). Versions are contiguous from 1,
+# so the pending steps for a database at version N are simply _MIGRATIONS[N:].
+_MIGRATIONS: List[Tuple[int, str, MigrationFn]] = []
+
+
+def _migration(version: int, description: str) -> Callable[[MigrationFn], MigrationFn]:
+    def register(fn: MigrationFn) -> MigrationFn:
+        expected = len(_MIGRATIONS) + 1
+        if version != expected:
+            raise RuntimeError(f"Migration {version} déclarée hors ordre (attendu: {expected})")
+        _MIGRATIONS.append((version, description, fn))
+        return fn
+
+    return register
+
+
+async def _execute_all(conn: aiosqlite.Connection, statements: Sequence[str]) -> None:
+    # executescript() would COMMIT first; run statements one by one to stay in the caller's transaction
+    for statement in statements:
+        await conn.execute(statement)
+
+
+@_migration(1, "schéma initial")
+async def _m001_initial(conn: aiosqlite.Connection) -> None:
+    # IF NOT EXISTS: databases created before versioning already hold these tables
+    await _execute_all(conn, (
         """
         CREATE TABLE IF NOT EXISTS schema_version (
             version INTEGER NOT NULL
-        );
+        )
+        """,
+        """
         CREATE TABLE IF NOT EXISTS counters (
             name TEXT PRIMARY KEY,
             value INTEGER NOT NULL
-        );
+        )
+        """,
+        """
         CREATE TABLE IF NOT EXISTS confessions (
             id INTEGER PRIMARY KEY,
             author_id INTEGER NOT NULL,
@@ -37,7 +126,9 @@ async def migrate(conn: aiosqlite.Connection) -> None:
             content TEXT NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             deleted INTEGER NOT NULL DEFAULT 0
-        );
+        )
+        """,
+        """
         CREATE TABLE IF NOT EXISTS confession_bans (
             user_id INTEGER PRIMARY KEY,
             guild_id INTEGER NOT NULL,
@@ -45,20 +136,22 @@ async def migrate(conn: aiosqlite.Connection) -> None:
             moderator_id INTEGER,
             active INTEGER NOT NULL DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        -- Voice temp hubs
+        )
+        """,
+        # Voice temp hubs (target_category_id is added by migration 2)
+        """
         CREATE TABLE IF NOT EXISTS voctemp_hubs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             guild_id INTEGER NOT NULL,
             category_id INTEGER NOT NULL,
-            -- optional target category for created voice rooms (added in v1.2)
-            target_category_id INTEGER,
             hub_channel_id INTEGER NOT NULL,
             name TEXT NOT NULL,
             perms_mask INTEGER NOT NULL DEFAULT 0,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        -- Voice temp rooms
+        )
+        """,
+        # Voice temp rooms
+        """
         CREATE TABLE IF NOT EXISTS voctemp_rooms (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             guild_id INTEGER NOT NULL,
@@ -69,44 +162,308 @@ async def migrate(conn: aiosqlite.Connection) -> None:
             control_message_id INTEGER,
             active INTEGER NOT NULL DEFAULT 1,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
-        -- Welcome/Goodbye settings
+        )
+        """,
+        # Welcome/Goodbye settings
+        """
         CREATE TABLE IF NOT EXISTS welcome_settings (
             guild_id INTEGER PRIMARY KEY,
             enabled INTEGER NOT NULL DEFAULT 1,
             welcome_channel_id INTEGER,
             goodbye_channel_id INTEGER,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        );
+        )
+        """,
+    ))
+
+
+@_migration(2, "voctemp_hubs.target_category_id")
+async def _m002_hub_target_category(conn: aiosqlite.Connection) -> None:
+    # Optional target category for created voice rooms (v1.2); unversioned databases may already have it
+    async with conn.execute("PRAGMA table_info(voctemp_hubs)") as cur:
+        cols = [row[1] async for row in cur]
+    if "target_category_id" not in cols:
+        await conn.execute("ALTER TABLE voctemp_hubs ADD COLUMN target_category_id INTEGER")
+
+
+@_migration(3, "index des requêtes chaudes voctemp/confessions")
+async def _m003_hot_indexes(conn: aiosqlite.Connection) -> None:
+    await _execute_all(conn, (
+        # Partial + covering: inactive rooms are never looked up, so they stay out of the index
         """
-    )
-    await conn.commit()
-    # Ensure target_category_id exists for older databases
+        CREATE INDEX IF NOT EXISTS idx_voctemp_rooms_active_voice
+        ON voctemp_rooms(guild_id, voice_channel_id, owner_id, hub_id, text_channel_id)
+        WHERE active=1
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_voctemp_hubs_channel
+        ON voctemp_hubs(guild_id, hub_channel_id, target_category_id, perms_mask)
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_confessions_message ON confessions(message_id)",
+        # confession_bans needs nothing: user_id is the INTEGER PRIMARY KEY (rowid lookup)
+    ))
+
+
+@_migration(4, "réserve de salons voctemp pré-créés")
+async def _m004_voctemp_spares(conn: aiosqlite.Connection) -> None:
+    await _execute_all(conn, (
+        "ALTER TABLE voctemp_hubs ADD COLUMN spare_pool_size INTEGER NOT NULL DEFAULT 0",
+        # Hidden voice channels created ahead of time, handed out on hub join
+        """
+        CREATE TABLE IF NOT EXISTS voctemp_spares (
+            voice_channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            hub_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ))
+
+
+@_migration(5, "mode du panneau voctemp (chat du salon vocal)")
+async def _m005_voctemp_panel_mode(conn: aiosqlite.Connection) -> None:
+    # 1: the control panel goes in the voice channel's own text chat, no companion channel
+    await conn.execute("ALTER TABLE voctemp_hubs ADD COLUMN panel_in_voice INTEGER NOT NULL DEFAULT 0")
+
+
+@_migration(6, "bannissements de confessions par serveur")
+async def _m006_confession_bans_per_guild(conn: aiosqlite.Connection) -> None:
+    # user_id alone was the key: banning a member in one guild replaced their ban row from another
+    await _execute_all(conn, (
+        """
+        CREATE TABLE confession_bans_new (
+            guild_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            reason TEXT,
+            moderator_id INTEGER,
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (guild_id, user_id)
+        )
+        """,
+        """
+        INSERT INTO confession_bans_new(guild_id, user_id, reason, moderator_id, active, created_at)
+        SELECT guild_id, user_id, reason, moderator_id, active, created_at FROM confession_bans
+        """,
+        "DROP TABLE confession_bans",
+        "ALTER TABLE confession_bans_new RENAME TO confession_bans",
+    ))
+
+
+def latest_schema_version() -> int:
+    return _MIGRATIONS[-1][0] if _MIGRATIONS else 0
+
+
+# Lookups on the event/interaction hot paths, with representative parameters.
+# find_plan_scans() flags any of them that the planner answers with a full SCAN.
+HOT_QUERIES: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    "voctemp_room_transfer": (
+        "UPDATE voctemp_rooms SET owner_id=? WHERE guild_id=? AND voice_channel_id=? AND active=1",
+        (1, 1, 1),
+    ),
+    "confession_by_message": (
+        "SELECT id, author_id, guild_id, channel_id, message_id, thread_id, parent_id, content, deleted FROM confessions WHERE message_id=?",
+        (1,),
+    ),
+    "confession_ban": (
+        "SELECT 1 FROM confession_bans WHERE user_id=? AND guild_id=? AND active=1",
+        (1, 1),
+    ),
+}
+
+
+async def find_plan_scans(conn: aiosqlite.Connection) -> List[Tuple[str, str]]:
+    """Return (query name, plan detail) for every hot query that degrades to a full SCAN."""
+    scans: List[Tuple[str, str]] = []
+    for name, (sql, params) in HOT_QUERIES.items():
+        async with conn.execute(f"EXPLAIN QUERY PLAN {sql}", params) as cur:
+            details = [str(row[3]) async for row in cur]
+        scans.extend((name, d) for d in details if d.startswith("SCAN"))
+    return scans
+
+
+async def get_schema_version(conn: aiosqlite.Connection) -> int:
     try:
-        async with conn.execute("PRAGMA table_info(voctemp_hubs)") as cur:
-            cols = [row[1] async for row in cur]
-        if "target_category_id" not in cols:
-            await conn.execute("ALTER TABLE voctemp_hubs ADD COLUMN target_category_id INTEGER")
-            await conn.commit()
-    except Exception:
-        # Ignore migration errors to avoid blocking startup; subsequent code guards for NULLs
-        pass
-
-
-async def next_counter(conn: aiosqlite.Connection, name: str) -> int:
-    async with conn.execute("SELECT value FROM counters WHERE name=?", (name,)) as cur:
-        row = await cur.fetchone()
-    if row is None:
-        await conn.execute("INSERT INTO counters(name, value) VALUES(?, 1)", (name,))
+        async with conn.execute("SELECT MAX(version) FROM schema_version") as cur:
+            row = await cur.fetchone()
+    except sqlite3.OperationalError:
+        # No schema_version table yet: brand new database
+        return 0
+    return int(row[0]) if row and row[0] is not None else 0
+
+
+async def migrate(conn: aiosqlite.Connection) -> int:
+    """Apply pending migrations in one transaction and return the schema version."""
+    latest = latest_schema_version()
+    if await get_schema_version(conn) >= latest:
+        return latest
+    # IMMEDIATE takes the write lock, then re-read in case another process migrated meanwhile
+    await conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = await get_schema_version(conn)
+        for _version, _description, step in _MIGRATIONS[current:]:
+            await step(conn)
+        await conn.execute("DELETE FROM schema_version")
+        await conn.execute("INSERT INTO schema_version(version) VALUES(?)", (max(current, latest),))
         await conn.commit()
-        return 1
-    value = int(row[0]) + 1
-    await conn.execute("UPDATE counters SET value=? WHERE name=?", (value, name))
-    await conn.commit()
-    return value
+    except BaseException:
+        await conn.rollback()
+        raise
+    return max(current, latest)
 
 
-async def get_counter(conn: aiosqlite.Connection, name: str) -> int:
-    async with conn.execute("SELECT value FROM counters WHERE name=?", (name,)) as cur:
+async def next_counter(conn: aiosqlite.Connection, name: str, step: int = 1) -> int:
+    # Single atomic UPSERT: no read-modify-write race, one commit
+    async with conn.execute(
+        "INSERT INTO counters(name, value) VALUES(?, ?) ON CONFLICT(name) DO UPDATE SET value=value+excluded.value RETURNING value",
+        (name, step),
+    ) as cur:
         row = await cur.fetchone()
-    return int(row[0]) if row else 0
+    await conn.commit()
+    return int(row[0])
+
+
+class WriteBehindQueue(BackgroundWorker):
+    """Group commit for bookkeeping writes nobody waits on."""
+
+    def __init__(self, db: "Database", max_batch: int = WRITE_BEHIND_MAX_BATCH, max_delay: float = WRITE_BEHIND_MAX_DELAY) -> None:
+        self._db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[str, Tuple]] = []
+        self._has_pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        # Metrics
+        self.batches = 0
+        self.statements = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def stop(self) -> None:
+        await super().stop()
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"{len(self._pending)} écriture(s) différée(s) perdue(s) à l'arrêt: {e}")
+
+    def defer(self, sql: str, params: Sequence = ()) -> None:
+        self._pending.append((sql, tuple(params)))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+
+    async def write(self, sql: str, params: Sequence = ()) -> None:
+        # Durable now: committed (together with anything queued before it) on return
+        self.defer(sql, params)
+        await self.flush()
+
+    async def write_many(self, sql: str, seq_of_params: Sequence[Sequence]) -> None:
+        for params in seq_of_params:
+            self.defer(sql, params)
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            self._has_pending.clear()
+            self._full.clear()
+            if not batch:
+                return
+            try:
+                async with self._db.acquire() as conn:
+                    for sql, params in batch:
+                        try:
+                            await conn.execute(sql, params)
+                        except sqlite3.Error as e:
+                            # One bad statement must not cost the rest of the batch
+                            logger.error(f"Écriture différée ignorée ({e}): {sql}")
+                    await conn.commit()
+            except BaseException:
+                # Rolled back by acquire(): keep the batch, ahead of anything deferred since, for the next flush
+                self._pending[:0] = batch
+                self._has_pending.set()
+                raise
+            self.batches += 1
+            self.statements += len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            if not self._full.is_set():
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                # Shielded so stop() never cancels a batch halfway through its commit
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Échec du commit groupé, {len(self._pending)} écriture(s) en attente: {e}")
+                await asyncio.sleep(self.max_delay)
+
+
+class CounterAllocator:
+    """Counter numbers served from blocks reserved in the database."""
+
+    def __init__(self, db: "Database", block_size: int = 1) -> None:
+        self._db = db
+        # A crash loses the unused part of a block (gaps, never duplicates); close() gives it back
+        self.block_size = max(1, block_size)
+        # name -> (next value to hand out, reserved high-water mark)
+        self._blocks: Dict[str, Tuple[int, int]] = {}
+        self._lock = asyncio.Lock()
+
+    async def next(self, name: str) -> int:
+        if self.block_size == 1:
+            async with self._db.acquire() as conn:
+                return await next_counter(conn, name)
+        async with self._lock:
+            value, high = self._blocks.get(name, (1, 0))
+            if value > high:
+                async with self._db.acquire() as conn:
+                    high = await next_counter(conn, name, self.block_size)
+                value = high - self.block_size + 1
+            self._blocks[name] = (value + 1, high)
+            return value
+
+    async def release(self) -> None:
+        async with self._lock:
+            blocks, self._blocks = self._blocks, {}
+            unused = [(value - 1, name, high) for name, (value, high) in blocks.items() if value <= high]
+            if not unused:
+                return
+            async with self._db.acquire() as conn:
+                # Only roll back marks nobody else moved in the meantime
+                await conn.executemany("UPDATE counters SET value=? WHERE name=? AND value=?", unused)
+                await conn.commit()
+
+
+async def _cli(path: Path, check_plans: bool) -> int:
+    conn = await _open(path)
+    try:
+        before = await get_schema_version(conn)
+        after = await migrate(conn)
+        scans = await find_plan_scans(conn) if check_plans else []
+    finally:
+        await conn.close()
+    if before == after:
+        print(f"{path}: schéma à jour (version {after})")
+    else:
+        print(f"{path}: migré de la version {before} à la version {after}")
+    for name, detail in scans:
+        print(f"SCAN détecté pour {name}: {detail}")
+    if check_plans and not scans:
+        print(f"Plans OK: {len(HOT_QUERIES)} requêtes chaudes indexées")
+    return 1 if scans else 0
+
+
+if __name__ == "__main__":
+    # python -m utils.db [--check-plans] [chemin/vers/bot.db]
+    args = sys.argv[1:]
+    check = "--check-plans" in args
+    paths = [a for a in args if a != "--check-plans"]
+    sys.exit(asyncio.run(_cli(Path(paths[0]) if paths else _DB_PATH, check)))
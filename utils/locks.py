@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Generic
+
+from utils.common import K
+
+
+class KeyedLock(Generic[K]):
+    """One asyncio.Lock per key, created on demand and dropped once nobody holds or waits on it."""
+
+    def __init__(self) -> None:
+        self._locks: Dict[K, asyncio.Lock] = {}
+        self._users: Dict[K, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def acquire(self, key: K) -> AsyncIterator[None]:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if self._users[key] == 0:
+                del self._users[key]
+                del self._locks[key]
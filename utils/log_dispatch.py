@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, List
+
+import discord
+
+logger = logging.getLogger("cigaming_bot.log_dispatch")
+
+# Discord limits per message: 10 embeds, 6000 characters across all of them
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+# Seconds a log embed may wait for others to share its message
+FLUSH_INTERVAL = 2.0
+
+
+class LogDispatcher:
+    """Buffers log embeds per channel and posts them several to a message."""
+
+    def __init__(self, interval: float = FLUSH_INTERVAL, max_embeds: int = MAX_EMBEDS) -> None:
+        self.interval = interval
+        self.max_embeds = max(1, min(max_embeds, MAX_EMBEDS))
+        self._channels: Dict[int, discord.abc.Messageable] = {}
+        self._pending: Dict[int, List[discord.Embed]] = {}
+        self._wakeups: Dict[int, asyncio.Event] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._closing = False
+        # Metrics
+        self.embeds = 0
+        self.messages = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return sum(len(p) for p in self._pending.values())
+
+    def post(self, channel: discord.abc.Messageable, embed: discord.Embed, urgent: bool = False) -> None:
+        channel_id = channel.id  # type: ignore[attr-defined]
+        self._channels[channel_id] = channel
+        pending = self._pending.setdefault(channel_id, [])
+        pending.append(embed)
+        wakeup = self._wakeups.setdefault(channel_id, asyncio.Event())
+        if urgent or self._closing or len(pending) >= self.max_embeds:
+            wakeup.set()
+        task = self._tasks.get(channel_id)
+        if task is None or task.done():
+            self._tasks[channel_id] = asyncio.create_task(self._run(channel_id))
+
+    async def stop(self) -> None:
+        self._closing = True
+        for wakeup in self._wakeups.values():
+            wakeup.set()
+        tasks = list(self._tasks.values())
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._closing = False
+
+    def _next_batch(self, pending: List[discord.Embed]) -> List[discord.Embed]:
+        batch: List[discord.Embed] = []
+        chars = 0
+        while pending and len(batch) < self.max_embeds:
+            size = len(pending[0])
+            if batch and chars + size > MAX_EMBED_CHARS:
+                break
+            batch.append(pending.pop(0))
+            chars += size
+        return batch
+
+    async def _run(self, channel_id: int) -> None:
+        wakeup = self._wakeups[channel_id]
+        try:
+            while self._pending.get(channel_id):
+                if not wakeup.is_set():
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout=self.interval)
+                    except asyncio.TimeoutError:
+                        pass
+                wakeup.clear()
+                pending = self._pending[channel_id]
+                while pending:
+                    batch = self._next_batch(pending)
+                    try:
+                        await self._channels[channel_id].send(embeds=batch)
+                    except Exception as e:
+                        self.failed += len(batch)
+                        logger.warning(f"Envoi de {len(batch)} log(s) dans {channel_id} échoué: {e}")
+                    else:
+                        self.embeds += len(batch)
+                        self.messages += 1
+        finally:
+            self._pending.pop(channel_id, None)
+            self._channels.pop(channel_id, None)
+            self._wakeups.pop(channel_id, None)
+            self._tasks.pop(channel_id, None)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Sequence, Tuple
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class StageTimings:
+    """Rolling duration samples (ms) per named stage, the last maxlen of each."""
+
+    def __init__(self, maxlen: int = 500) -> None:
+        self.maxlen = maxlen
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, stage: str, ms: float) -> None:
+        samples = self._samples.get(stage)
+        if samples is None:
+            samples = self._samples[stage] = deque(maxlen=self.maxlen)
+        samples.append(ms)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def summary(self, stage: str) -> Optional[Tuple[float, float, int]]:
+        # (p50, p99, sample count), None before the first sample
+        samples = list(self._samples.get(stage, ()))
+        if not samples:
+            return None
+        return percentile(samples, 0.5), percentile(samples, 0.99), len(samples)
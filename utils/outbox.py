@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from utils.common import BackgroundWorker
+from utils.metrics import StageTimings
+
+logger = logging.getLogger("cigaming_bot.outbox")
+
+Job = Callable[[], Awaitable[None]]
+
+# Seconds stop() lets the worker spend on jobs still queued at shutdown
+DRAIN_TIMEOUT = 5.0
+
+
+class Outbox(BackgroundWorker):
+    """Side effects nobody waits on (DMs), run in order by one background task."""
+
+    def __init__(self, timings: Optional[StageTimings] = None, drain_timeout: float = DRAIN_TIMEOUT) -> None:
+        self.timings = timings
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue[Tuple[str, Job]] = asyncio.Queue()
+        # Metrics
+        self.delivered = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"{self._queue.qsize()} envoi(s) abandonné(s) à l'arrêt")
+        await super().stop()
+
+    def put(self, stage: str, job: Job) -> None:
+        self._queue.put_nowait((stage, job))
+
+    async def _run(self) -> None:
+        while True:
+            stage, job = await self._queue.get()
+            start = time.perf_counter()
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Envoi en arrière-plan échoué ({stage}): {e}")
+            else:
+                self.delivered += 1
+            finally:
+                if self.timings is not None:
+                    self.timings.record(stage, (time.perf_counter() - start) * 1000)
+                self._queue.task_done()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional, Tuple
+
+# Ids identifying who is limited, e.g. (guild_id, user_id)
+Key = Tuple[int, ...]
+
+# Seconds between two full sweeps of refilled buckets
+SWEEP_INTERVAL = 60.0
+
+
+class RateLimiter:
+    """Token bucket per key: bursts of up to `rate` calls, refilled at rate/per tokens a second."""
+
+    def __init__(self, rate: int, per: float, sweep_interval: float = SWEEP_INTERVAL) -> None:
+        self.rate = max(1, rate)
+        self.per = per
+        self.sweep_interval = sweep_interval
+        # key -> (tokens left, monotonic time they were counted at)
+        self._buckets: Dict[Key, Tuple[float, float]] = {}
+        self._next_sweep = time.monotonic() + sweep_interval
+        # Metrics
+        self.allowed = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _refilled(self, bucket: Tuple[float, float], now: float) -> float:
+        tokens, at = bucket
+        return min(float(self.rate), tokens + (now - at) * self.rate / self.per)
+
+    def _tokens(self, key: Key, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.rate)
+        tokens = self._refilled(bucket, now)
+        if tokens >= self.rate:
+            del self._buckets[key]
+            self.expired += 1
+        return tokens
+
+    def hit(self, key: Key) -> bool:
+        # Take one token; False (and nothing taken) when the bucket is empty
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self.sweep(now)
+        tokens = self._tokens(key, now)
+        if tokens < 1:
+            self.rejected += 1
+            return False
+        self._buckets[key] = (tokens - 1, now)
+        self.allowed += 1
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        self._next_sweep = now + self.sweep_interval
+        full = [k for k, bucket in self._buckets.items() if self._refilled(bucket, now) >= self.rate]
+        for k in full:
+            del self._buckets[k]
+        self.expired += len(full)
+        return len(full)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Tuple
+
+from utils.common import BackgroundWorker, K
+
+logger = logging.getLogger("cigaming_bot.scheduler")
+
+class DeadlineScheduler(BackgroundWorker, Generic[K]):
+    """One background task for many keyed deadlines."""
+
+    def __init__(self, on_due: Callable[[List[K]], Awaitable[None]], batch_window: float = 1.0) -> None:
+        self._on_due = on_due
+        self.batch_window = batch_window
+        self._deadlines: Dict[K, float] = {}
+        self._heap: List[Tuple[float, int, K]] = []
+        self._seq = 0
+        self._wakeup = asyncio.Event()
+        # Metrics
+        self.fired = 0
+        self.batches = 0
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._deadlines
+
+    def schedule(self, key: K, delay: float) -> None:
+        # (Re)arm key; a previous deadline for it is superseded
+        deadline = time.monotonic() + delay
+        self._deadlines[key] = deadline
+        self._seq += 1
+        heapq.heappush(self._heap, (deadline, self._seq, key))
+        if self._heap[0][1] == self._seq:
+            # New earliest deadline: the runner must shorten its sleep
+            self._wakeup.set()
+        self._compact()
+
+    def cancel(self, key: K) -> bool:
+        return self._deadlines.pop(key, None) is not None
+
+    def _compact(self) -> None:
+        # Stale heap entries are cheap but unbounded under join/leave flapping
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._deadlines):
+            self._heap = [e for e in self._heap if self._deadlines.get(e[2]) == e[0]]
+            heapq.heapify(self._heap)
+
+    def _next_deadline(self) -> Optional[float]:
+        while self._heap:
+            deadline, _, key = self._heap[0]
+            if self._deadlines.get(key) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now: float) -> List[K]:
+        due: List[K] = []
+        horizon = now + self.batch_window
+        while self._heap and self._heap[0][0] <= horizon:
+            deadline, _, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == deadline:
+                del self._deadlines[key]
+                due.append(key)
+        return due
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            deadline = self._next_deadline()
+            if deadline is None:
+                await self._wakeup.wait()
+                continue
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+            due = self._pop_due(time.monotonic())
+            if not due:
+                continue
+            self.batches += 1
+            self.fired += len(due)
+            try:
+                await asyncio.shield(self._on_due(due))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Échéances non traitées: {due}")